@@ -0,0 +1,52 @@
+"""
+Shared API dependencies for Personal Finance Chatbot
+"""
+
+from fastapi import Depends, HTTPException, Request, status
+import redis.asyncio as redis
+
+from app.core.batching import AsyncBatcher
+from app.core.bloom import BloomFilter
+from app.core.memo import RequestMemo
+from app.core.security import RedisRateLimiter
+from app.services.watson_service import WatsonService
+
+def get_watson_service(request: Request) -> WatsonService:
+    """Return the process-wide Watson service created at startup"""
+    return request.app.state.watson_service
+
+def get_predict_batcher(request: Request) -> AsyncBatcher:
+    """Return the prediction batcher started at startup"""
+    return request.app.state.predict_batcher
+
+def get_redis(request: Request) -> redis.Redis:
+    """Return the pooled Redis client created at startup"""
+    return request.app.state.redis
+
+def get_user_bloom(request: Request) -> BloomFilter:
+    """Return the registered-user Bloom filter loaded at startup"""
+    return request.app.state.user_bloom
+
+def get_request_memo(request: Request) -> RequestMemo:
+    """Return the call memo scoped to the current request"""
+    memo = getattr(request.state, "memo", None)
+    if memo is None:
+        memo = request.state.memo = RequestMemo()
+    return memo
+
+def get_rate_limiter(request: Request) -> RedisRateLimiter:
+    """Return the Redis-backed rate limiter created at startup"""
+    return request.app.state.rate_limiter
+
+async def enforce_rate_limit(
+    request: Request,
+    limiter: RedisRateLimiter = Depends(get_rate_limiter)
+) -> None:
+    """Reject the request once the client exceeds its per-minute budget for this route"""
+    client = request.client.host if request.client else "unknown"
+    if not await limiter.is_allowed(f"{client}:{request.url.path}"):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again later.",
+            headers={"Retry-After": "60"}
+        )
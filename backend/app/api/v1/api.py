@@ -2,12 +2,15 @@
 Main API router for Personal Finance Chatbot
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.api.deps import enforce_rate_limit
 from app.api.v1.endpoints import auth, chat, ai_analytics
 
 api_router = APIRouter()
 
-# Include all endpoint modules
-api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-api_router.include_router(chat.router, prefix="/chat", tags=["AI Chat"])
-api_router.include_router(ai_analytics.router, prefix="/ai-analytics", tags=["AI Analytics"])
+# Include all endpoint modules, each limited per client through the shared Redis limiter
+rate_limited = [Depends(enforce_rate_limit)]
+api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"], dependencies=rate_limited)
+api_router.include_router(chat.router, prefix="/chat", tags=["AI Chat"], dependencies=rate_limited)
+api_router.include_router(ai_analytics.router, prefix="/ai-analytics", tags=["AI Analytics"], dependencies=rate_limited)
@@ -2,18 +2,52 @@
 AI Analytics endpoints for advanced financial analysis
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from pydantic import BaseModel
+import orjson
+import redis.asyncio as redis
 from typing import Dict, Any, List, Optional
+import asyncio
 import logging
-from datetime import datetime
 
+from app.api.deps import get_predict_batcher, get_redis, get_request_memo, get_watson_service
+from app.core.batching import AsyncBatcher
+from app.core.cache import build_cache_key, get_cached, payload_digest, set_cached
+from app.core.clock import iso_now_cached
+from app.core.memo import RequestMemo
 from app.core.security import verify_token
-from app.services.watson_service import WatsonService
+from app.services.watson_service import BATCHED_PREDICTION_TYPES, WatsonService
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Static part of the health response, built once at import
+_HEALTH_STATIC = {
+    "status": "healthy",
+    "service": "AI Analytics Service",
+    "capabilities": (
+        "Financial Predictions",
+        "AI-Powered Insights",
+        "Comprehensive Analysis",
+        "Sentiment Analysis",
+        "Statistical Modeling"
+    )
+}
+
+# Encoded health body and the timestamp it was built for
+_health_body = b""
+_health_timestamp = ""
+
+def _health_response_body() -> bytes:
+    """Return the encoded health payload, rebuilding it at most once per second"""
+    global _health_body, _health_timestamp
+    
+    timestamp = iso_now_cached()
+    if timestamp != _health_timestamp:
+        _health_body = orjson.dumps({**_HEALTH_STATIC, "timestamp": timestamp})
+        _health_timestamp = timestamp
+    return _health_body
+
 class PredictionRequest(BaseModel):
     prediction_type: str = "spending"  # spending, savings, investment
     user_data: Dict[str, Any]
@@ -28,21 +62,33 @@ class FinancialAnalysisRequest(BaseModel):
 @router.post("/predict", response_model=Dict[str, Any])
 async def predict_financial_outcomes(
     request: PredictionRequest,
-    current_user: Dict[str, Any] = Depends(verify_token)
+    current_user: Dict[str, Any] = Depends(verify_token),
+    watson_service: WatsonService = Depends(get_watson_service),
+    predict_batcher: AsyncBatcher = Depends(get_predict_batcher),
+    redis_client: redis.Redis = Depends(get_redis)
 ):
     """Predict financial outcomes using AI and statistical analysis"""
     try:
         user_id = current_user.get("sub")
         logger.info(f"Financial prediction requested for user {user_id}: {request.prediction_type}")
         
-        # Initialize Watson service
-        watson_service = WatsonService()
-        
-        # Make prediction
-        prediction = await watson_service.predict_financial_outcomes(
-            request.user_data,
-            request.prediction_type
-        )
+        # Serve identical requests from the per-user cache
+        cache_key = build_cache_key(user_id, f"predict:{request.prediction_type}", payload_digest(request.user_data))
+        cached = await get_cached(redis_client, cache_key)
+        if cached is not None:
+            cached["timestamp"] = iso_now_cached()
+            return cached
+        
+        # Make prediction, batching it with concurrent requests of the same shape
+        if request.prediction_type in BATCHED_PREDICTION_TYPES:
+            prediction = await predict_batcher.process(
+                (request.user_data, request.prediction_type)
+            )
+        else:
+            prediction = await watson_service.predict_financial_outcomes(
+                request.user_data,
+                request.prediction_type
+            )
         
         if "error" in prediction:
             raise HTTPException(
@@ -50,11 +96,18 @@ async def predict_financial_outcomes(
                 detail=prediction["error"]
             )
         
+        # Cache without the timestamp; every response is stamped fresh
+        prediction = {key: value for key, value in prediction.items() if key != "timestamp"}
+        await set_cached(redis_client, cache_key, prediction)
+        prediction["timestamp"] = iso_now_cached()
+        
         logger.info(f"Prediction completed successfully for user {user_id}")
         return prediction
         
-    except Exception as e:
-        logger.error(f"Prediction failed: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Prediction failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate prediction. Please try again."
@@ -63,15 +116,19 @@ async def predict_financial_outcomes(
 @router.post("/insights", response_model=List[Dict[str, Any]])
 async def generate_ai_insights(
     request: AIInsightsRequest,
-    current_user: Dict[str, Any] = Depends(verify_token)
+    current_user: Dict[str, Any] = Depends(verify_token),
+    watson_service: WatsonService = Depends(get_watson_service),
+    redis_client: redis.Redis = Depends(get_redis)
 ):
     """Generate AI-powered financial insights and recommendations"""
     try:
         user_id = current_user.get("sub")
         logger.info(f"AI insights requested for user {user_id}")
         
-        # Initialize Watson service
-        watson_service = WatsonService()
+        cache_key = build_cache_key(user_id, "insights", payload_digest(request.user_data))
+        cached = await get_cached(redis_client, cache_key)
+        if cached is not None:
+            return cached
         
         # Generate insights
         insights = await watson_service.generate_ai_insights(request.user_data)
@@ -79,11 +136,17 @@ async def generate_ai_insights(
         if not insights:
             return []
         
+        # Failed insights must not be replayed for the whole TTL
+        if not any(isinstance(insight, dict) and "error" in insight for insight in insights):
+            await set_cached(redis_client, cache_key, insights)
+        
         logger.info(f"Generated {len(insights)} AI insights for user {user_id}")
         return insights
         
-    except Exception as e:
-        logger.error(f"AI insights generation failed: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("AI insights generation failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate AI insights. Please try again."
@@ -92,88 +155,95 @@ async def generate_ai_insights(
 @router.post("/analyze", response_model=Dict[str, Any])
 async def comprehensive_financial_analysis(
     request: FinancialAnalysisRequest,
-    current_user: Dict[str, Any] = Depends(verify_token)
+    current_user: Dict[str, Any] = Depends(verify_token),
+    watson_service: WatsonService = Depends(get_watson_service),
+    redis_client: redis.Redis = Depends(get_redis),
+    memo: RequestMemo = Depends(get_request_memo)
 ):
     """Perform comprehensive financial analysis using AI"""
     try:
         user_id = current_user.get("sub")
         logger.info(f"Comprehensive analysis requested for user {user_id}: {request.analysis_type}")
         
-        # Initialize Watson service
-        watson_service = WatsonService()
+        # Hash user_data once; the digest keys both the response cache and the call memo
+        digest = payload_digest(request.user_data)
+        cache_key = build_cache_key(user_id, f"analyze:{request.analysis_type}", digest)
+        cached = await get_cached(redis_client, cache_key)
+        if cached is not None:
+            cached["timestamp"] = iso_now_cached()
+            return cached
+        
+        def predict(prediction_type: str):
+            return memo.call(
+                ("predict", digest, prediction_type),
+                lambda: watson_service.predict_financial_outcomes(request.user_data, prediction_type)
+            )
+        
+        def insights():
+            return memo.call(
+                ("insights", digest),
+                lambda: watson_service.generate_ai_insights(request.user_data)
+            )
         
         analysis_results = {}
         
         if request.analysis_type == "comprehensive":
-            # Generate all types of insights
-            insights = await watson_service.generate_ai_insights(request.user_data)
-            analysis_results["ai_insights"] = insights
-            
-            # Generate predictions for different aspects
-            spending_prediction = await watson_service.predict_financial_outcomes(
-                request.user_data, "spending"
-            )
-            analysis_results["spending_prediction"] = spending_prediction
-            
-            savings_prediction = await watson_service.predict_financial_outcomes(
-                request.user_data, "savings"
-            )
-            analysis_results["savings_prediction"] = savings_prediction
+            # Insights and predictions are independent, so run them concurrently
+            tasks = [
+                insights(),
+                predict("spending"),
+                predict("savings")
+            ]
             
             # Add sentiment analysis if user has recent messages
             if request.user_data.get("recent_messages"):
-                sentiment_analysis = await watson_service.analyze_sentiment(
+                tasks.append(watson_service.analyze_sentiment(
                     " ".join(request.user_data["recent_messages"])
-                )
-                analysis_results["sentiment_analysis"] = sentiment_analysis
+                ))
+            
+            results = await asyncio.gather(*tasks)
+            analysis_results["ai_insights"] = results[0]
+            analysis_results["spending_prediction"] = results[1]
+            analysis_results["savings_prediction"] = results[2]
+            if len(results) > 3:
+                analysis_results["sentiment_analysis"] = results[3]
         
         elif request.analysis_type == "portfolio":
             # Focus on investment analysis
             if request.user_data.get("portfolio"):
-                investment_prediction = await watson_service.predict_financial_outcomes(
-                    request.user_data, "investment"
-                )
-                analysis_results["investment_analysis"] = investment_prediction
+                analysis_results["investment_analysis"] = await predict("investment")
         
         elif request.analysis_type == "spending":
-            # Focus on spending analysis
-            spending_prediction = await watson_service.predict_financial_outcomes(
-                request.user_data, "spending"
-            )
-            analysis_results["spending_analysis"] = spending_prediction
-            
-            # Add spending insights
+            # Focus on spending analysis, with insights fetched alongside
             if request.user_data.get("transactions"):
-                insights = await watson_service.generate_ai_insights(request.user_data)
-                spending_insights = [insight for insight in insights if "spending" in insight.get("type", "")]
+                spending_prediction, all_insights = await asyncio.gather(predict("spending"), insights())
+                spending_insights = [insight for insight in all_insights if "spending" in insight.get("type", "")]
+                analysis_results["spending_analysis"] = spending_prediction
                 analysis_results["spending_insights"] = spending_insights
+            else:
+                analysis_results["spending_analysis"] = await predict("spending")
         
         analysis_results["analysis_type"] = request.analysis_type
-        analysis_results["timestamp"] = datetime.utcnow().isoformat()
         analysis_results["user_id"] = user_id
         
+        # Failed sub-analyses must not be replayed, and each response gets a fresh timestamp
+        if not any(isinstance(result, dict) and "error" in result for result in analysis_results.values()):
+            await set_cached(redis_client, cache_key, analysis_results)
+        analysis_results["timestamp"] = iso_now_cached()
+        
         logger.info(f"Comprehensive analysis completed for user {user_id}")
         return analysis_results
         
-    except Exception as e:
-        logger.error(f"Comprehensive analysis failed: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Comprehensive analysis failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to perform financial analysis. Please try again."
         )
 
-@router.get("/health", response_model=Dict[str, Any])
+@router.get("/health")
 async def ai_analytics_health():
     """Health check for AI analytics service"""
-    return {
-        "status": "healthy",
-        "service": "AI Analytics Service",
-        "capabilities": [
-            "Financial Predictions",
-            "AI-Powered Insights", 
-            "Comprehensive Analysis",
-            "Sentiment Analysis",
-            "Statistical Modeling"
-        ],
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return Response(content=_health_response_body(), media_type="application/json")
@@ -2,17 +2,24 @@
 Authentication endpoints for Personal Finance Chatbot
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordRequestForm
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
+import redis.asyncio as redis
 
-from app.core.database import get_db
+from app.api.deps import get_redis, get_user_bloom
+from app.core.bloom import BloomFilter, user_bloom_keys
+from app.core.database import User, get_db
 from app.core.security import (
-    verify_password, 
-    get_password_hash, 
+    aget_password_hash,
+    averify_password, 
     create_user_token,
+    password_needs_rehash,
+    revoke_token,
     validate_password_strength,
     validate_email
 )
@@ -25,7 +32,8 @@ router = APIRouter()
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    user_bloom: BloomFilter = Depends(get_user_bloom)
 ):
     """Register a new user"""
     try:
@@ -44,39 +52,51 @@ async def register(
                 detail=f"Password too weak: {', '.join(password_validation['errors'])}"
             )
         
-        # Check if user already exists
-        user_service = UserService(db)
-        existing_user = await user_service.get_user_by_email(user_data.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User with this email already exists"
+        # Check if user already exists; a Bloom filter miss means neither is taken
+        bloom_keys = user_bloom_keys(user_data.email, user_data.username)
+        if any(key in user_bloom for key in bloom_keys):
+            # One round-trip for both checks; a session can't run queries concurrently
+            result = await db.execute(
+                select(User.email, User.username).where(
+                    or_(User.email == user_data.email, User.username == user_data.username)
+                )
             )
+            existing = result.all()
+            
+            if any(row.email == user_data.email for row in existing):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="User with this email already exists"
+                )
+            
+            if any(row.username == user_data.username for row in existing):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Username already taken"
+                )
         
-        existing_username = await user_service.get_user_by_username(user_data.username)
-        if existing_username:
+        # Create new user, hashing off the event loop; the unique constraints
+        # catch anything the filter missed
+        user = User(
+            **user_data.model_dump(exclude={"password"}),
+            hashed_password=await aget_password_hash(user_data.password)
+        )
+        db.add(user)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
+                detail="User with this email or username already exists"
             )
         
-        # Create new user
-        user = await user_service.create_user(user_data)
+        for key in bloom_keys:
+            user_bloom.add(key)
         
         logger.info(f"New user registered: {user.email}")
         
-        return UserResponse(
-            id=user.id,
-            email=user.email,
-            username=user.username,
-            full_name=user.full_name,
-            age=user.age,
-            occupation=user.occupation,
-            income_level=user.income_level,
-            risk_tolerance=user.risk_tolerance,
-            is_active=user.is_active,
-            created_at=user.created_at
-        )
+        return UserResponse.model_validate(user)
         
     except HTTPException:
         raise
@@ -104,8 +124,9 @@ async def login(
                 detail="Invalid email or password"
             )
         
-        # Verify password
-        if not verify_password(user_credentials.password, user.hashed_password):
+        # Verify password off the event loop; hashing is CPU-bound
+        password_ok = await averify_password(user_credentials.password, user.hashed_password)
+        if not password_ok:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
@@ -118,29 +139,22 @@ async def login(
                 detail="Account is deactivated"
             )
         
+        # Migrate bcrypt or outdated argon2 hashes while the plain password is at hand
+        if password_needs_rehash(user.hashed_password):
+            try:
+                user.hashed_password = await aget_password_hash(user_credentials.password)
+                await db.commit()
+            except Exception as e:
+                # No rollback here: it would expire the user loaded above, and the
+                # session is discarded at the end of the request anyway
+                logger.error(f"Password rehash failed for {user.email}: {e}")
+        
         # Generate tokens
         tokens = create_user_token(user.id, user.email)
         
         logger.info(f"User logged in: {user.email}")
         
-        return TokenResponse(
-            access_token=tokens["access_token"],
-            refresh_token=tokens["refresh_token"],
-            token_type=tokens["token_type"],
-            expires_in=tokens["expires_in"],
-            user=UserResponse(
-                id=user.id,
-                email=user.email,
-                username=user.username,
-                full_name=user.full_name,
-                age=user.age,
-                occupation=user.occupation,
-                income_level=user.income_level,
-                risk_tolerance=user.risk_tolerance,
-                is_active=user.is_active,
-                created_at=user.created_at
-            )
-        )
+        return TokenResponse(**tokens, user=UserResponse.model_validate(user))
         
     except HTTPException:
         raise
@@ -154,13 +168,14 @@ async def login(
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
     refresh_token: str,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """Refresh access token using refresh token"""
     try:
         # Verify refresh token
         from app.core.security import verify_token
-        payload = verify_token(refresh_token)
+        payload = await verify_token(refresh_token, request)
         
         # Check if it's a refresh token
         if payload.get("type") != "refresh":
@@ -183,24 +198,7 @@ async def refresh_token(
         
         logger.info(f"Token refreshed for user: {user.email}")
         
-        return TokenResponse(
-            access_token=tokens["access_token"],
-            refresh_token=tokens["refresh_token"],
-            token_type=tokens["token_type"],
-            expires_in=tokens["expires_in"],
-            user=UserResponse(
-                id=user.id,
-                email=user.email,
-                username=user.username,
-                full_name=user.full_name,
-                age=user.age,
-                occupation=user.occupation,
-                income_level=user.income_level,
-                risk_tolerance=user.risk_tolerance,
-                is_active=user.is_active,
-                created_at=user.created_at
-            )
-        )
+        return TokenResponse(**tokens, user=UserResponse.model_validate(user))
         
     except HTTPException:
         raise
@@ -212,8 +210,17 @@ async def refresh_token(
         )
 
 @router.post("/logout")
-async def logout():
-    """Logout user (client should discard tokens)"""
+async def logout(
+    refresh_token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """Logout user, revoking the access token and, if given, the refresh token"""
+    if credentials is not None:
+        await revoke_token(redis_client, credentials.credentials)
+    # Otherwise /refresh would keep minting access tokens after logout
+    if refresh_token is not None:
+        await revoke_token(redis_client, refresh_token)
     return {"message": "Successfully logged out"}
 
 @router.post("/forgot-password")
@@ -3,10 +3,13 @@ Chat endpoints for AI Financial Advisor
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any
+import orjson
 import logging
 
+from app.core.keywords import KeywordMatcher
 from app.core.security import verify_token
 from app.services.watson_service import WatsonService
 from app.services.financial_service import FinancialService
@@ -42,51 +45,101 @@ async def chat_with_ai(
             confidence=0.85
         )
         
-    except Exception as e:
-        logger.error(f"Chat failed: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Chat failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate response. Please try again."
         )
 
+@router.post("/chat/stream")
+async def chat_with_ai_stream(
+    chat_request: ChatRequest,
+    current_user: Dict[str, Any] = Depends(verify_token)
+):
+    """Chat with AI Financial Advisor, streaming the reply as Server-Sent Events"""
+    return StreamingResponse(
+        sse_generator(chat_request.message, current_user),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def sse_generator(message: str, user_context: Dict[str, Any]) -> AsyncIterator[str]:
+    """Yield the advice reply as SSE delta events followed by a done event"""
+    try:
+        # The keyword path produces the whole reply at once, so it ships as a single delta
+        response = generate_financial_advice(message, user_context)
+        yield f"data: {orjson.dumps({'delta': response}).decode()}\n\n"
+        yield f"data: {orjson.dumps({'done': True, 'confidence': 0.85}).decode()}\n\n"
+        
+        logger.info(f"AI chat response streamed for user {user_context.get('sub')}")
+        
+    except Exception:
+        logger.exception("Chat stream failed")
+        yield f"event: error\ndata: {orjson.dumps({'detail': 'Failed to generate response. Please try again.'}).decode()}\n\n"
+
+# Advice categories in priority order; the first matching category wins
+ADVICE_KEYWORDS = {
+    "investment": ['invest', 'investment', 'stock', 'portfolio'],
+    "budget": ['budget', 'saving', 'expense'],
+    "debt": ['debt', 'credit', 'loan'],
+    "retirement": ['retirement', '401k', 'ira'],
+    "emergency": ['emergency', 'fund'],
+    "insurance": ['insurance', 'protection'],
+    "tax": ['tax', 'deduction', 'refund']
+}
+
+# Built once at import so each message is scanned in a single pass
+advice_matcher = KeywordMatcher(ADVICE_KEYWORDS)
+
+# Advice text, built once at import
+_ADVICE = {
+    "investment_conservative": "For conservative investors, I recommend focusing on low-risk investments like government bonds, high-quality corporate bonds, and dividend-paying blue-chip stocks. Consider a 60/40 bond-to-stock ratio for stability.",
+    "investment_aggressive": "With an aggressive risk profile, you might consider growth stocks, emerging markets, and alternative investments. However, ensure you have a diversified portfolio and can handle market volatility.",
+    "investment_moderate": "For moderate risk tolerance, a balanced portfolio with 50% stocks, 30% bonds, and 20% alternative investments could work well. Consider index funds for broad market exposure.",
+    "budget": "Start by tracking all your expenses for a month. Use the 50/30/20 rule: 50% for needs, 30% for wants, and 20% for savings. Consider using budgeting apps and setting up automatic transfers to savings accounts.",
+    "debt": "Focus on high-interest debt first (credit cards, payday loans). Consider debt consolidation or balance transfers for better rates. Pay more than minimum payments when possible. For student loans, explore income-driven repayment plans.",
+    "retirement_early": "Start early! Contribute to your 401(k) up to the employer match, then consider a Roth IRA. With decades ahead, you can afford to be more aggressive in your investments.",
+    "retirement_mid": "Maximize your 401(k) contributions and consider catch-up contributions if you're over 50. Review your asset allocation and ensure you're on track for your retirement goals.",
+    "retirement_late": "Focus on preserving capital while maintaining growth. Consider reducing stock exposure and increasing bond allocation. Review your retirement timeline and adjust your strategy accordingly.",
+    "emergency": "Aim for 3-6 months of living expenses in an emergency fund. Keep it in a high-yield savings account for easy access. Start small and build it up gradually.",
+    "insurance": "Ensure you have health, auto, and home/renters insurance. Consider life insurance if you have dependents, and disability insurance to protect your income. Review your coverage annually.",
+    "tax": "Maximize tax-advantaged accounts like 401(k)s and IRAs. Consider itemizing deductions if you have significant expenses. Keep good records and consider consulting a tax professional for complex situations.",
+    "default": "I'd be happy to help with your financial questions! You can ask me about investments, budgeting, debt management, retirement planning, emergency funds, insurance, or taxes. What specific area would you like to discuss?"
+}
+
+def _investment_advice(user_context: Dict[str, Any]) -> str:
+    risk_tolerance = user_context.get('risk_tolerance', 'moderate')
+    if risk_tolerance == 'conservative':
+        return _ADVICE["investment_conservative"]
+    elif risk_tolerance == 'aggressive':
+        return _ADVICE["investment_aggressive"]
+    else:
+        return _ADVICE["investment_moderate"]
+
+def _retirement_advice(user_context: Dict[str, Any]) -> str:
+    age = user_context.get('age', 30)
+    if age < 30:
+        return _ADVICE["retirement_early"]
+    elif age < 50:
+        return _ADVICE["retirement_mid"]
+    else:
+        return _ADVICE["retirement_late"]
+
+# Categories whose advice depends on the user's profile
+ADVICE_RESPONSES = {
+    "investment": _investment_advice,
+    "retirement": _retirement_advice
+}
+
 def generate_financial_advice(message: str, user_context: Dict[str, Any]) -> str:
     """Generate financial advice based on user message and context"""
     
-    message_lower = message.lower()
-    
-    # Basic keyword-based responses (you can enhance this with AI/ML)
-    if any(word in message_lower for word in ['invest', 'investment', 'stock', 'portfolio']):
-        risk_tolerance = user_context.get('risk_tolerance', 'moderate')
-        if risk_tolerance == 'conservative':
-            return "For conservative investors, I recommend focusing on low-risk investments like government bonds, high-quality corporate bonds, and dividend-paying blue-chip stocks. Consider a 60/40 bond-to-stock ratio for stability."
-        elif risk_tolerance == 'aggressive':
-            return "With an aggressive risk profile, you might consider growth stocks, emerging markets, and alternative investments. However, ensure you have a diversified portfolio and can handle market volatility."
-        else:
-            return "For moderate risk tolerance, a balanced portfolio with 50% stocks, 30% bonds, and 20% alternative investments could work well. Consider index funds for broad market exposure."
-    
-    elif any(word in message_lower for word in ['budget', 'saving', 'expense']):
-        return "Start by tracking all your expenses for a month. Use the 50/30/20 rule: 50% for needs, 30% for wants, and 20% for savings. Consider using budgeting apps and setting up automatic transfers to savings accounts."
+    category = advice_matcher.best_category(message)
+    if category is None:
+        return _ADVICE["default"]
     
-    elif any(word in message_lower for word in ['debt', 'credit', 'loan']):
-        return "Focus on high-interest debt first (credit cards, payday loans). Consider debt consolidation or balance transfers for better rates. Pay more than minimum payments when possible. For student loans, explore income-driven repayment plans."
-    
-    elif any(word in message_lower for word in ['retirement', '401k', 'ira']):
-        age = user_context.get('age', 30)
-        if age < 30:
-            return "Start early! Contribute to your 401(k) up to the employer match, then consider a Roth IRA. With decades ahead, you can afford to be more aggressive in your investments."
-        elif age < 50:
-            return "Maximize your 401(k) contributions and consider catch-up contributions if you're over 50. Review your asset allocation and ensure you're on track for your retirement goals."
-        else:
-            return "Focus on preserving capital while maintaining growth. Consider reducing stock exposure and increasing bond allocation. Review your retirement timeline and adjust your strategy accordingly."
-    
-    elif any(word in message_lower for word in ['emergency', 'fund']):
-        return "Aim for 3-6 months of living expenses in an emergency fund. Keep it in a high-yield savings account for easy access. Start small and build it up gradually."
-    
-    elif any(word in message_lower for word in ['insurance', 'protection']):
-        return "Ensure you have health, auto, and home/renters insurance. Consider life insurance if you have dependents, and disability insurance to protect your income. Review your coverage annually."
-    
-    elif any(word in message_lower for word in ['tax', 'deduction', 'refund']):
-        return "Maximize tax-advantaged accounts like 401(k)s and IRAs. Consider itemizing deductions if you have significant expenses. Keep good records and consider consulting a tax professional for complex situations."
-    
-    else:
-        return "I'd be happy to help with your financial questions! You can ask me about investments, budgeting, debt management, retirement planning, emergency funds, insurance, or taxes. What specific area would you like to discuss?"
+    respond = ADVICE_RESPONSES.get(category)
+    return respond(user_context) if respond else _ADVICE[category]
@@ -0,0 +1,16 @@
+"""
+msgspec fast-path API router for Personal Finance Chatbot
+"""
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import enforce_rate_limit
+from app.api.v2.endpoints import ai_analytics, chat
+
+api_router = APIRouter()
+
+# Same handlers as v1, with request bodies decoded by msgspec instead of pydantic
+# Rate limited exactly like v1
+rate_limited = [Depends(enforce_rate_limit)]
+api_router.include_router(chat.router, prefix="/chat", tags=["AI Chat (msgspec)"], dependencies=rate_limited)
+api_router.include_router(ai_analytics.router, prefix="/ai-analytics", tags=["AI Analytics (msgspec)"], dependencies=rate_limited)
@@ -0,0 +1,86 @@
+"""
+msgspec fast-path AI analytics endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+import msgspec
+import redis.asyncio as redis
+from typing import Dict, Any
+import logging
+
+from app.api.deps import get_predict_batcher, get_redis, get_watson_service
+from app.core.batching import AsyncBatcher
+from app.core.cache import build_cache_key, get_cached, payload_digest, set_cached
+from app.core.clock import iso_now_cached
+from app.core.responses import MsgspecJSONResponse
+from app.core.security import verify_token
+from app.services.watson_service import BATCHED_PREDICTION_TYPES, WatsonService
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+class PredictionMsg(msgspec.Struct):
+    user_data: Dict[str, Any]
+    prediction_type: str = "spending"  # spending, savings, investment
+
+_prediction_decoder = msgspec.json.Decoder(PredictionMsg)
+
+@router.post("/predict", response_class=MsgspecJSONResponse)
+async def predict_financial_outcomes(
+    request: Request,
+    current_user: Dict[str, Any] = Depends(verify_token),
+    watson_service: WatsonService = Depends(get_watson_service),
+    predict_batcher: AsyncBatcher = Depends(get_predict_batcher),
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """Predict financial outcomes, decoding and validating the body in one msgspec pass"""
+    try:
+        payload = _prediction_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    try:
+        user_id = current_user.get("sub")
+        logger.info(f"Financial prediction requested for user {user_id}: {payload.prediction_type}")
+        
+        cache_key = build_cache_key(user_id, f"predict:{payload.prediction_type}", payload_digest(payload.user_data))
+        cached = await get_cached(redis_client, cache_key)
+        if cached is not None:
+            cached["timestamp"] = iso_now_cached()
+            return MsgspecJSONResponse(cached)
+        
+        if payload.prediction_type in BATCHED_PREDICTION_TYPES:
+            prediction = await predict_batcher.process(
+                (payload.user_data, payload.prediction_type)
+            )
+        else:
+            prediction = await watson_service.predict_financial_outcomes(
+                payload.user_data,
+                payload.prediction_type
+            )
+        
+        if "error" in prediction:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=prediction["error"]
+            )
+        
+        # Cache without the timestamp; every response is stamped fresh
+        prediction = {key: value for key, value in prediction.items() if key != "timestamp"}
+        await set_cached(redis_client, cache_key, prediction)
+        prediction["timestamp"] = iso_now_cached()
+        
+        logger.info(f"Prediction completed successfully for user {user_id}")
+        return MsgspecJSONResponse(prediction)
+        
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Prediction failed")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate prediction. Please try again."
+        )
@@ -0,0 +1,54 @@
+"""
+msgspec fast-path chat endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+import msgspec
+from typing import Dict, Any
+import logging
+
+from app.api.v1.endpoints.chat import generate_financial_advice
+from app.core.responses import MsgspecJSONResponse
+from app.core.security import verify_token
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+class ChatMsg(msgspec.Struct):
+    message: str
+
+class ChatReply(msgspec.Struct):
+    response: str
+    confidence: float = 0.0
+
+_chat_decoder = msgspec.json.Decoder(ChatMsg)
+
+@router.post("/chat", response_class=MsgspecJSONResponse)
+async def chat_with_ai(
+    request: Request,
+    current_user: Dict[str, Any] = Depends(verify_token)
+):
+    """Chat with AI Financial Advisor, decoding and validating the body in one msgspec pass"""
+    try:
+        payload = _chat_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    try:
+        response = generate_financial_advice(payload.message, current_user)
+        
+        logger.info(f"AI chat response generated for user {current_user.get('sub')}")
+        
+        return MsgspecJSONResponse(ChatReply(response=response, confidence=0.85))
+        
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Chat failed")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate response. Please try again."
+        )
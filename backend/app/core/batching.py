@@ -0,0 +1,85 @@
+"""
+Dynamic request batching for Personal Finance Chatbot
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class AsyncBatcher:
+    """Group concurrent awaiters into batches handled by a single call"""
+    
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_queue_time: float = 0.05
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._queue: "asyncio.Queue[Tuple[Any, asyncio.Future]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start the background batching loop"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the batching loop"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+    
+    async def process(self, item: Any) -> Any:
+        """Queue an item and wait for its result from the next batch"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+    
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Wait for one item, then gather more until the batch is full or time runs out"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_queue_time
+        
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            
+            try:
+                results = await self.process_batch(items)
+                if len(results) != len(batch):
+                    # zip() would silently leave the unmatched awaiters hanging
+                    raise RuntimeError(
+                        f"process_batch returned {len(results)} results for {len(batch)} items"
+                    )
+            except Exception as e:
+                logger.error(f"Batch processing failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
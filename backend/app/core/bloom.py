@@ -0,0 +1,64 @@
+"""
+Bloom filter for cheap negative membership checks
+"""
+
+import hashlib
+import logging
+import math
+from typing import List
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, User
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized from an expected item count and error rate"""
+    
+    def __init__(self, expected_items: int, error_rate: float):
+        # Optimal bit count and hash count for the requested false-positive rate
+        self.size = max(8, int(-expected_items * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / expected_items * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, item: str) -> List[int]:
+        # Double hashing over one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+    
+    def add(self, item: str) -> None:
+        """Add an item to the filter"""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, item: str) -> bool:
+        """False means definitely absent; True means possibly present"""
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+def user_bloom_keys(email: str, username: str) -> List[str]:
+    """Return the filter keys identifying a user's email and username"""
+    return [f"email:{email}", f"username:{username}"]
+
+async def load_user_bloom() -> BloomFilter:
+    """Build the registered-user filter from every email and username in the database"""
+    bloom = BloomFilter(settings.USER_BLOOM_CAPACITY, settings.USER_BLOOM_ERROR_RATE)
+    
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            select(User.email, User.username).execution_options(yield_per=10000)
+        )
+        count = 0
+        async for email, username in result:
+            for key in user_bloom_keys(email, username):
+                bloom.add(key)
+            count += 1
+    
+    logger.info(f"User Bloom filter loaded with {count} users")
+    return bloom
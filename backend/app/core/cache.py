@@ -0,0 +1,51 @@
+"""
+Redis response cache for Personal Finance Chatbot
+"""
+
+import hashlib
+import logging
+from typing import Any, Optional
+
+import orjson
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def create_redis_client() -> redis.Redis:
+    """Create the pooled Redis client shared by the whole app"""
+    return redis.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT,
+        socket_timeout=settings.CACHE_REDIS_TIMEOUT
+    )
+
+def payload_digest(payload: Any) -> str:
+    """Return a stable digest of a JSON-serializable payload"""
+    return hashlib.sha256(
+        orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+    ).hexdigest()
+
+def build_cache_key(user_id: Any, scope: str, digest: str) -> str:
+    """Build a per-user cache key from a scope and a payload digest"""
+    return f"{settings.CACHE_PREFIX}:{user_id}:{scope}:{digest}"
+
+async def get_cached(client: redis.Redis, key: str) -> Optional[Any]:
+    """Return the cached value for key, or None on a miss or Redis failure"""
+    try:
+        cached = await client.get(key)
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+    return orjson.loads(cached) if cached is not None else None
+
+async def set_cached(client: redis.Redis, key: str, value: Any, ttl: int = settings.CACHE_TTL) -> None:
+    """Store value under key for ttl seconds, ignoring Redis failures"""
+    try:
+        await client.set(key, orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY, default=str), ex=ttl)
+    except RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
@@ -0,0 +1,17 @@
+"""
+Cheap timestamp helpers for Personal Finance Chatbot
+"""
+
+import time
+from datetime import datetime
+
+# Wall-clock second and its ISO string, shared by every caller within that second
+_ts_cache = [-1, ""]
+
+def iso_now_cached() -> str:
+    """Return the current UTC time as an ISO string, formatted at most once per second"""
+    second = int(time.time())
+    if _ts_cache[0] != second:
+        _ts_cache[1] = datetime.utcfromtimestamp(second).isoformat()
+        _ts_cache[0] = second
+    return _ts_cache[1]
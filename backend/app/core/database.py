@@ -6,23 +6,48 @@ from sqlalchemy import create_engine, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON
-from sqlalchemy.orm import relationship
-from datetime import datetime
-from typing import Optional
+from sqlalchemy.pool import NullPool
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON, Index, func, insert, select
+from sqlalchemy.orm import deferred, relationship
+from typing import Any, Dict, List, Optional
 import json
+import orjson
 
 from app.core.config import settings
 
 # Database URL conversion for async
 async_database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
+def _json_serializer(value: Any) -> str:
+    """Encode JSON column values with orjson"""
+    return orjson.dumps(value).decode()
+
+# Pool sizing; NullPool defers pooling to an external pooler such as PgBouncer
+if settings.DB_USE_NULL_POOL:
+    pool_options = {"poolclass": NullPool}
+else:
+    pool_options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 # Create async engine
 engine = create_async_engine(
     async_database_url,
     echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=300,
+    # JSON columns are (de)serialized on every load/commit; orjson is much faster than json
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    connect_args={
+        # Keep parsed statements warm on each asyncpg connection
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {"jit": "off"},
+    },
+    **pool_options,
 )
 
 # Create async session
@@ -33,6 +58,8 @@ AsyncSessionLocal = sessionmaker(
 )
 
 # Base class for models
+# Large JSON columns are deferred; load them with .options(undefer(...)) where needed.
+# Relationships raise instead of lazy loading; opt in per query with selectinload(...)
 Base = declarative_base()
 
 # Dependency to get database session
@@ -60,14 +87,17 @@ class User(Base):
     risk_tolerance = Column(String(20))  # low, medium, high
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Fetch server-set timestamps via RETURNING instead of expiring them after flush
+    __mapper_args__ = {"eager_defaults": True}
     
     # Relationships
-    transactions = relationship("Transaction", back_populates="user")
-    goals = relationship("FinancialGoal", back_populates="user")
-    chat_sessions = relationship("ChatSession", back_populates="user")
-    financial_profile = relationship("FinancialProfile", back_populates="user", uselist=False)
+    transactions = relationship("Transaction", back_populates="user", lazy="raise_on_sql")
+    goals = relationship("FinancialGoal", back_populates="user", lazy="raise_on_sql")
+    chat_sessions = relationship("ChatSession", back_populates="user", lazy="raise_on_sql")
+    financial_profile = relationship("FinancialProfile", back_populates="user", uselist=False, lazy="raise_on_sql")
 
 # Transaction Model
 class Transaction(Base):
@@ -83,10 +113,19 @@ class Transaction(Base):
     transaction_date = Column(DateTime, nullable=False)
     transaction_type = Column(String(20))  # income, expense, transfer
     tags = Column(JSON)  # Store tags as JSON array
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    # Per-user history, newest first; BRIN for time-range scans over the append-only log
+    __table_args__ = (
+        Index("ix_transactions_user_id_transaction_date", user_id, transaction_date.desc()),
+        Index(
+            "ix_transactions_created_at_brin", created_at,
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32}
+        ),
+    )
     
     # Relationships
-    user = relationship("User", back_populates="transactions")
+    user = relationship("User", back_populates="transactions", lazy="raise_on_sql")
 
 # Financial Goal Model
 class FinancialGoal(Base):
@@ -103,11 +142,14 @@ class FinancialGoal(Base):
     goal_type = Column(String(50))  # savings, investment, debt_payoff
     priority = Column(String(20))  # low, medium, high
     status = Column(String(20), default="active")  # active, completed, paused
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Fetch server-set timestamps via RETURNING instead of expiring them after flush
+    __mapper_args__ = {"eager_defaults": True}
     
     # Relationships
-    user = relationship("User", back_populates="goals")
+    user = relationship("User", back_populates="goals", lazy="raise_on_sql")
 
 # Financial Profile Model
 class FinancialProfile(Base):
@@ -121,13 +163,13 @@ class FinancialProfile(Base):
     savings_rate = Column(Float, default=0.0)
     debt_to_income_ratio = Column(Float, default=0.0)
     emergency_fund = Column(Float, default=0.0)
-    investment_portfolio = Column(JSON)  # Store portfolio as JSON
+    investment_portfolio = deferred(Column(JSON))  # Store portfolio as JSON
     credit_score = Column(Integer)
     financial_health_score = Column(Float, default=0.0)
-    last_updated = Column(DateTime, default=datetime.utcnow)
+    last_updated = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    user = relationship("User", back_populates="financial_profile")
+    user = relationship("User", back_populates="financial_profile", lazy="raise_on_sql")
 
 # Chat Session Model
 class ChatSession(Base):
@@ -136,15 +178,15 @@ class ChatSession(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     session_id = Column(String(255), unique=True, index=True)
-    context = Column(JSON)  # Store conversation context
-    user_profile = Column(JSON)  # Store user profile snapshot
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_activity = Column(DateTime, default=datetime.utcnow)
+    context = deferred(Column(JSON))  # Store conversation context
+    user_profile = deferred(Column(JSON))  # Store user profile snapshot
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_activity = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True)
     
     # Relationships
-    user = relationship("User", back_populates="chat_sessions")
-    messages = relationship("ChatMessage", back_populates="session")
+    user = relationship("User", back_populates="chat_sessions", lazy="raise_on_sql")
+    messages = relationship("ChatMessage", back_populates="session", lazy="raise_on_sql")
 
 # Chat Message Model
 class ChatMessage(Base):
@@ -154,11 +196,20 @@ class ChatMessage(Base):
     session_id = Column(Integer, ForeignKey("chat_sessions.id"), nullable=False)
     message_type = Column(String(20))  # user, assistant, system
     content = Column(Text, nullable=False)
-    metadata = Column(JSON)  # Store additional message data
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    # "metadata" is reserved on declarative classes, so map the column under another name
+    message_metadata = deferred(Column("metadata", JSON))  # Store additional message data
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Messages are appended in time order, so a BRIN index stays tiny and cheap to maintain
+    __table_args__ = (
+        Index(
+            "ix_chat_messages_timestamp_brin", timestamp,
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32}
+        ),
+    )
     
     # Relationships
-    session = relationship("ChatSession", back_populates="messages")
+    session = relationship("ChatSession", back_populates="messages", lazy="raise_on_sql")
 
 # Financial Category Model
 class FinancialCategory(Base):
@@ -171,7 +222,7 @@ class FinancialCategory(Base):
     icon = Column(String(100))
     color = Column(String(7))  # Hex color code
     is_default = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 # AI Model Response Cache
 class AIResponseCache(Base):
@@ -183,8 +234,8 @@ class AIResponseCache(Base):
     response = Column(Text, nullable=False)
     model_used = Column(String(100))
     confidence_score = Column(Float)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    expires_at = Column(DateTime)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime, index=True)  # Indexed for expiry sweeps
 
 # Financial Insights Model
 class FinancialInsight(Base):
@@ -195,13 +246,18 @@ class FinancialInsight(Base):
     insight_type = Column(String(50))  # spending_pattern, savings_opportunity, investment_tip
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
-    data = Column(JSON)  # Store insight data as JSON
+    data = deferred(Column(JSON))  # Store insight data as JSON
     priority = Column(String(20))  # low, medium, high
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    # Per-user insights, newest first
+    __table_args__ = (
+        Index("ix_financial_insights_user_id_created_at", user_id, created_at.desc()),
+    )
     
     # Relationships
-    user = relationship("User")
+    user = relationship("User", lazy="raise_on_sql")
 
 # Initialize database
 async def init_db():
@@ -215,6 +271,41 @@ async def get_db_session():
     async with AsyncSessionLocal() as session:
         return session
 
+# Bulk writes: one executemany round-trip instead of a session.add()/commit() per row
+async def bulk_insert_transactions(session: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert many transactions at once and return their ids"""
+    if not rows:
+        return []
+    result = await session.execute(insert(Transaction).returning(Transaction.id), rows)
+    return list(result.scalars())
+
+async def bulk_insert_chat_messages(session: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert many chat messages at once and return their ids"""
+    if not rows:
+        return []
+    result = await session.execute(insert(ChatMessage).returning(ChatMessage.id), rows)
+    return list(result.scalars())
+
+# AI response cache: one round-trip per batch of query hashes
+async def get_cached_responses(session: AsyncSession, hashes: List[str]) -> Dict[str, str]:
+    """Return unexpired cached responses keyed by query hash"""
+    if not hashes:
+        return {}
+    result = await session.execute(
+        select(AIResponseCache.query_hash, AIResponseCache.response)
+        .where(AIResponseCache.query_hash.in_(hashes))
+        .where(AIResponseCache.expires_at > func.now())
+    )
+    return dict(result.all())
+
+async def store_cached_responses(session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Insert cache rows, leaving any hash that is already cached untouched"""
+    if not rows:
+        return
+    await session.execute(
+        pg_insert(AIResponseCache).values(rows).on_conflict_do_nothing(index_elements=["query_hash"])
+    )
+
 async def close_db():
     """Close database connections"""
     await engine.dispose()
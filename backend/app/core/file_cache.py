@@ -0,0 +1,70 @@
+"""
+On-disk JSON cache for Personal Finance Chatbot
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_PATH_CHARS = re.compile(r"[^A-Za-z0-9._^=-]")
+
+class FileCache:
+    """JSON files with a per-read TTL, surviving restarts and shareable across replicas
+    
+    Entries live at {root}/{key}/{endpoint}-{md5(params)}.json; freshness is
+    judged from the file's modification time.
+    """
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+    
+    def _path(self, key: str, endpoint: str, params: Dict[str, Any]) -> Path:
+        digest = hashlib.md5(orjson.dumps(params, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        return self.root / _UNSAFE_PATH_CHARS.sub("_", key) / f"{endpoint}-{digest}.json"
+    
+    def get(self, key: str, endpoint: str, params: Dict[str, Any], ttl: float) -> Optional[Any]:
+        """Return the cached value, or None if missing, expired or unreadable"""
+        path = self._path(key, endpoint, params)
+        try:
+            if time.time() - path.stat().st_mtime > ttl:
+                return None
+            return orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+    
+    def set(self, key: str, endpoint: str, params: Dict[str, Any], value: Any) -> None:
+        """Write a value atomically so concurrent readers never see a partial file"""
+        path = self._path(key, endpoint, params)
+        try:
+            data = orjson.dumps(value, default=str)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"File cache write failed for {path}: {e}")
+    
+    def get_or_fetch(
+        self,
+        key: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        fetch: Callable[[], Any],
+        ttl: float
+    ) -> Any:
+        """Return the cached value, calling fetch() and storing its result on a miss"""
+        value = self.get(key, endpoint, params, ttl)
+        if value is None:
+            value = fetch()
+            self.set(key, endpoint, params, value)
+        return value
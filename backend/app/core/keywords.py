@@ -0,0 +1,69 @@
+"""
+Keyword matching utilities for Personal Finance Chatbot
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+class KeywordMatcher:
+    """Match keyword categories against text in a single pass
+    
+    Uses a pyahocorasick automaton when available, otherwise one compiled
+    regex alternation with the same substring semantics.
+    """
+    
+    def __init__(self, categories: Dict[str, Sequence[str]]):
+        # Category order doubles as match priority
+        self.priority: List[str] = list(categories)
+        
+        owners: Dict[str, List[str]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                owners.setdefault(keyword.lower(), []).append(category)
+        
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, keyword_categories in owners.items():
+                self._automaton.add_word(keyword, tuple(keyword_categories))
+            self._automaton.make_automaton()
+            return
+        
+        self._automaton = None
+        
+        # Longest keywords first, so a match at any position is the longest keyword
+        # starting there; every other keyword starting there is one of its prefixes
+        ordered = sorted(owners, key=len, reverse=True)
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in ordered) + "))")
+        self._closure: Dict[str, Tuple[str, ...]] = {
+            keyword: tuple({
+                category
+                for other, other_categories in owners.items()
+                if keyword.startswith(other)
+                for category in other_categories
+            })
+            for keyword in owners
+        }
+    
+    def categories(self, text: str) -> Set[str]:
+        """Return every category with at least one keyword occurring in text"""
+        hits: Set[str] = set()
+        if self._automaton is not None:
+            for _, keyword_categories in self._automaton.iter(text.lower()):
+                hits.update(keyword_categories)
+        else:
+            for match in self._pattern.finditer(text.lower()):
+                hits.update(self._closure[match.group(1)])
+        return hits
+    
+    def best_category(self, text: str) -> Optional[str]:
+        """Return the highest-priority matching category, or None"""
+        hits = self.categories(text)
+        for category in self.priority:
+            if category in hits:
+                return category
+        return None
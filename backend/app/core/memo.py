@@ -0,0 +1,20 @@
+"""
+Request-scoped call memoization for Personal Finance Chatbot
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class RequestMemo:
+    """Share the result of identical awaitable calls made while handling one request"""
+    
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+    
+    async def call(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await factory() once per key; later and concurrent calls with the key share it"""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+        return await task
@@ -0,0 +1,18 @@
+"""
+Response classes for Personal Finance Chatbot
+"""
+
+from typing import Any
+
+import msgspec
+from fastapi.responses import Response
+
+_encoder = msgspec.json.Encoder()
+
+class MsgspecJSONResponse(Response):
+    """JSON response encoded by msgspec; Structs are written straight to bytes"""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return _encoder.encode(content)
@@ -2,26 +2,82 @@
 Security utilities for Personal Finance Chatbot
 """
 
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import HTTPException, status
+from typing import Deque, Dict, Optional, Union, Any
+from jwt import PyJWTError
+import jwt
+from fastapi import HTTPException, Request, status
+from argon2 import PasswordHasher
+from cachetools import TTLCache
+from argon2.exceptions import InvalidHashError, VerificationError
+import asyncio
+import base64
+import bcrypt
+import orjson
+import re
+import logging
+import redis.asyncio as redis
+from redis.exceptions import RedisError
 import secrets
 import hashlib
+import os
+import threading
+import time
 
 from app.core.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# Argon2id hasher for new passwords; bcrypt hashes are still accepted
+password_hasher = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    # Dispatch on the hash prefix so existing bcrypt users can still log in
+    if hashed_password.startswith("$argon2"):
+        try:
+            return password_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+    
+    try:
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError:
+        # Malformed or foreign hash
+        return False
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+# Dedicated pool for CPU-bound hashing so login bursts can't starve the default executor;
+# argon2-cffi and bcrypt release the GIL, so threads run them in parallel
+_PWD_POOL = ThreadPoolExecutor(
+    max_workers=max(2, (os.cpu_count() or 2) // 2),
+    thread_name_prefix="pwd"
+)
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_PWD_POOL, verify_password, plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_PWD_POOL, get_password_hash, password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash is bcrypt or uses outdated argon2 parameters"""
+    if not hashed_password.startswith("$argon2"):
+        return True
+    return password_hasher.check_needs_rehash(hashed_password)
 
 def create_access_token(
     data: dict, 
@@ -45,21 +101,72 @@ def create_access_token(
     )
     return encoded_jwt
 
-def verify_token(token: str) -> dict:
-    """Verify JWT token and return payload"""
+# Verified payloads keyed by token, so repeat requests skip signature checks.
+# Revocations live in Redis so every worker sees them.
+_TOKEN_CACHE: TTLCache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+_token_cache_lock = threading.Lock()
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _decode_token(token: str) -> dict:
+    """Decode and verify a JWT, reusing cached payloads"""
+    with _token_cache_lock:
+        payload = _TOKEN_CACHE.get(token)
+    
+    # A cached payload is only valid until the token itself expires; callers get
+    # a copy so mutating it cannot leak into later requests
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return dict(payload)
+    
     try:
         payload = jwt.decode(
             token, 
             settings.JWT_SECRET, 
             algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    except PyJWTError:
+        raise _credentials_exception()
+    
+    with _token_cache_lock:
+        _TOKEN_CACHE[token] = payload
+    return dict(payload)
+
+def _revocation_key(token: str, payload: dict) -> str:
+    return f"revoked:{payload.get('jti') or hash_query(token)}"
+
+async def verify_token(token: str, request: Request) -> dict:
+    """Verify JWT token and return payload"""
+    payload = _decode_token(token)
+    try:
+        revoked = await request.app.state.redis.exists(_revocation_key(token, payload))
+    except RedisError as e:
+        logger.warning(f"Revocation check failed: {e}")
+        revoked = False
+    if revoked:
+        raise _credentials_exception()
+    return payload
+
+async def revoke_token(client: redis.Redis, token: str) -> bool:
+    """Reject a valid token in every worker until it would have expired"""
+    try:
+        payload = _decode_token(token)
+    except HTTPException:
+        # Invalid or expired tokens are already rejected
+        return False
+    
+    ttl = int(payload.get("exp", 0) - time.time())
+    if ttl <= 0:
+        return False
+    
+    with _token_cache_lock:
+        _TOKEN_CACHE.pop(token, None)
+    await client.set(_revocation_key(token, payload), 1, ex=ttl)
+    return True
 
 def create_refresh_token(data: dict) -> str:
     """Create JWT refresh token"""
@@ -80,25 +187,45 @@ def generate_api_key() -> str:
 
 def hash_query(query: str) -> str:
     """Hash query for caching purposes"""
-    return hashlib.sha256(query.encode()).hexdigest()
+    # 128-bit BLAKE2b: faster than sha256 in CPython and ample for cache keys
+    return hashlib.blake2b(query.encode(), digest_size=16).hexdigest()
+
+# Characters accepted as "special" by validate_password_strength
+_PASSWORD_SPECIAL_CHARS = frozenset("!@#$%^&*()_+-=[]{}|;:,.<>?")
 
 def validate_password_strength(password: str) -> dict:
     """Validate password strength"""
     errors = []
     
+    # Classify every character in a single pass, stopping once all classes are seen
+    has_upper = has_lower = has_digit = has_special = False
+    for c in password:
+        if c.isupper():
+            has_upper = True
+        elif c.islower():
+            has_lower = True
+        elif c.isdigit():
+            has_digit = True
+        elif c in _PASSWORD_SPECIAL_CHARS:
+            has_special = True
+        else:
+            continue
+        if has_upper and has_lower and has_digit and has_special:
+            break
+    
     if len(password) < 8:
         errors.append("Password must be at least 8 characters long")
     
-    if not any(c.isupper() for c in password):
+    if not has_upper:
         errors.append("Password must contain at least one uppercase letter")
     
-    if not any(c.islower() for c in password):
+    if not has_lower:
         errors.append("Password must contain at least one lowercase letter")
     
-    if not any(c.isdigit() for c in password):
+    if not has_digit:
         errors.append("Password must contain at least one number")
     
-    if not any(c in "!@#$%^&*()_+-=[]{}|;:,.<>?" for c in password):
+    if not has_special:
         errors.append("Password must contain at least one special character")
     
     return {
@@ -107,14 +234,17 @@ def validate_password_strength(password: str) -> dict:
         "score": max(0, 5 - len(errors))
     }
 
+# Characters stripped by sanitize_input, removed in one C-level pass
+_SANITIZE_TABLE = str.maketrans("", "", '<>&"\'')
+_JAVASCRIPT_SCHEME_RE = re.compile(r"javascript:", re.IGNORECASE)
+_DATA_SCHEME_RE = re.compile(r"data:", re.IGNORECASE)
+
 def sanitize_input(input_string: str) -> str:
     """Sanitize user input to prevent injection attacks"""
-    # Remove potentially dangerous characters
-    dangerous_chars = ["<", ">", "&", '"', "'", "javascript:", "data:"]
-    sanitized = input_string
-    
-    for char in dangerous_chars:
-        sanitized = sanitized.replace(char, "")
+    # Remove potentially dangerous characters, then script-capable URL schemes
+    sanitized = input_string.translate(_SANITIZE_TABLE)
+    sanitized = _JAVASCRIPT_SCHEME_RE.sub("", sanitized)
+    sanitized = _DATA_SCHEME_RE.sub("", sanitized)
     
     # Limit length
     if len(sanitized) > 1000:
@@ -126,12 +256,16 @@ def generate_session_id() -> str:
     """Generate unique session ID"""
     return secrets.token_urlsafe(16)
 
+# Compiled once at import; validate_email runs on every auth request
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
 def validate_email(email: str) -> bool:
     """Validate email format"""
-    import re
+    # Cheap rejections before running the regex (254 is the RFC 5321 path limit)
+    if len(email) > 254 or "@" not in email:
+        return False
     
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.fullmatch(email) is not None
 
 def create_user_token(user_id: int, email: str) -> dict:
     """Create user authentication tokens"""
@@ -152,6 +286,9 @@ def create_user_token(user_id: int, email: str) -> dict:
         "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
     }
 
+# Padding to restore, indexed by segment length mod 4
+_B64_PADDING = ("", "===", "==", "=")
+
 def decode_token_payload(token: str) -> dict:
     """Decode JWT token without verification (for debugging)"""
     try:
@@ -160,15 +297,10 @@ def decode_token_payload(token: str) -> dict:
         if len(parts) != 3:
             raise ValueError("Invalid token format")
         
-        import base64
-        import json
-        
-        # Decode payload
+        # Decode payload; JWT segments are unpadded URL-safe base64
         payload = parts[1]
-        # Add padding if needed
-        payload += '=' * (4 - len(payload) % 4)
-        decoded = base64.b64decode(payload)
-        return json.loads(decoded)
+        decoded = base64.urlsafe_b64decode(payload + _B64_PADDING[len(payload) % 4])
+        return orjson.loads(decoded)
     except Exception as e:
         raise ValueError(f"Failed to decode token: {str(e)}")
 
@@ -179,27 +311,67 @@ class RateLimiter:
     def __init__(self, max_requests: int = 60, window_seconds: int = 60):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = {}
+        self.requests: Dict[str, Deque[float]] = defaultdict(deque)
+        self._last_sweep = time.monotonic()
     
     def is_allowed(self, identifier: str) -> bool:
         """Check if request is allowed"""
-        now = datetime.utcnow()
+        now = time.monotonic()
+        cutoff = now - self.window_seconds
         
-        if identifier not in self.requests:
-            self.requests[identifier] = []
+        # Drop idle identifiers once per window so the table can't grow unbounded
+        if now - self._last_sweep >= self.window_seconds:
+            self.sweep(now)
         
-        # Remove old requests outside the window
-        self.requests[identifier] = [
-            req_time for req_time in self.requests[identifier]
-            if (now - req_time).seconds < self.window_seconds
-        ]
+        # Remove old requests outside the window; timestamps are in arrival order
+        timestamps = self.requests[identifier]
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
         
         # Check if under limit
-        if len(self.requests[identifier]) < self.max_requests:
-            self.requests[identifier].append(now)
+        if len(timestamps) < self.max_requests:
+            timestamps.append(now)
             return True
         
         return False
+    
+    def sweep(self, now: Optional[float] = None) -> None:
+        """Forget identifiers with no requests inside the current window"""
+        now = time.monotonic() if now is None else now
+        cutoff = now - self.window_seconds
+        stale = [
+            identifier for identifier, timestamps in self.requests.items()
+            if not timestamps or timestamps[-1] <= cutoff
+        ]
+        for identifier in stale:
+            del self.requests[identifier]
+        self._last_sweep = now
+
+# Atomic fixed-window counter: INCR, and start the window on the first hit
+_RATE_LIMIT_LUA = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+end
+return count
+"""
+
+class RedisRateLimiter:
+    """Fixed-window rate limiter shared by all workers through Redis"""
+    
+    def __init__(self, client: redis.Redis, max_requests: int = 60, window_seconds: int = 60):
+        self.max_requests = max_requests
+        self.window_ms = window_seconds * 1000
+        self._script = client.register_script(_RATE_LIMIT_LUA)
+    
+    async def is_allowed(self, identifier: str) -> bool:
+        """Check if request is allowed, failing open if Redis is unavailable"""
+        try:
+            count = await self._script(keys=[f"rl:{identifier}"], args=[self.window_ms])
+        except RedisError as e:
+            logger.warning(f"Rate limit check failed for {identifier}: {e}")
+            return True
+        return count <= self.max_requests
 
 # Global rate limiter instance
 rate_limiter = RateLimiter(
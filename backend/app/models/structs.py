@@ -0,0 +1,91 @@
+"""
+msgspec response structs for Personal Finance Chatbot
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+import msgspec
+
+T = TypeVar("T", bound=msgspec.Struct)
+
+def from_orm(obj: object, struct_type: Type[T]) -> T:
+    """Build a struct from an ORM instance by reading its attributes"""
+    return msgspec.convert(obj, struct_type, from_attributes=True)
+
+class UserResponseMsg(msgspec.Struct):
+    """User response struct"""
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    is_verified: bool
+    created_at: datetime
+    full_name: Optional[str] = None
+    age: Optional[int] = None
+    occupation: Optional[str] = None
+    income_level: Optional[str] = None
+    risk_tolerance: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+class FinancialGoalResponseMsg(msgspec.Struct):
+    """Financial goal response struct"""
+    id: int
+    user_id: int
+    title: str
+    target_amount: float
+    current_amount: float
+    currency: str
+    goal_type: str
+    priority: str
+    status: str
+    created_at: datetime
+    description: Optional[str] = None
+    target_date: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class TransactionResponseMsg(msgspec.Struct):
+    """Transaction response struct"""
+    id: int
+    user_id: int
+    amount: float
+    currency: str
+    category: str
+    transaction_date: datetime
+    transaction_type: str
+    created_at: datetime
+    subcategory: Optional[str] = None
+    description: Optional[str] = None
+    tags: Optional[List[str]] = None
+
+class FinancialProfileResponseMsg(msgspec.Struct):
+    """Financial profile response struct"""
+    id: int
+    user_id: int
+    net_worth: float
+    monthly_income: float
+    monthly_expenses: float
+    savings_rate: float
+    debt_to_income_ratio: float
+    emergency_fund: float
+    financial_health_score: float
+    last_updated: datetime
+    investment_portfolio: Optional[dict] = None
+    credit_score: Optional[int] = None
+
+class SummaryMetricsMsg(msgspec.Struct):
+    """Transaction summary metrics struct"""
+    total_transactions: int
+    total_spent: float
+    total_income: float
+    total_expenses: float
+    net_flow: float
+    top_spending_categories: List[Tuple[Any, float]]
+    average_transaction: float
+
+class HealthScoreMsg(msgspec.Struct, frozen=True):
+    """Financial health score struct; immutable so cached instances can be shared"""
+    component_scores: Dict[str, int]
+    overall_score: float
+    grade: str
+    recommendations: Tuple[str, ...]
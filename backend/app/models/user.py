@@ -2,10 +2,17 @@
 User models for Personal Finance Chatbot
 """
 
-from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+from typing import Literal, Optional, List
 from datetime import datetime
 
+# Enumerated fields are Literal types, validated as a set lookup rather than a regex
+Level = Literal["low", "medium", "high"]
+GoalType = Literal["savings", "investment", "debt_payoff", "emergency_fund", "retirement", "other"]
+GoalStatus = Literal["active", "completed", "paused", "cancelled"]
+TransactionType = Literal["income", "expense", "transfer"]
+Visibility = Literal["public", "private", "friends_only"]
+
 class UserBase(BaseModel):
     """Base user model"""
     email: EmailStr
@@ -13,24 +20,19 @@ class UserBase(BaseModel):
     full_name: Optional[str] = Field(None, max_length=255)
     age: Optional[int] = Field(None, ge=13, le=120)
     occupation: Optional[str] = Field(None, max_length=100)
-    income_level: Optional[str] = Field(None, regex="^(low|medium|high)$")
-    risk_tolerance: Optional[str] = Field(None, regex="^(low|medium|high)$")
+    income_level: Optional[Level] = None
+    risk_tolerance: Optional[Level] = None
 
 class UserCreate(UserBase):
     """User creation model"""
     password: str = Field(..., min_length=8, max_length=128)
     
-    @validator('username')
+    @field_validator('username')
+    @classmethod
     def validate_username(cls, v):
         if not v.isalnum():
             raise ValueError('Username must contain only alphanumeric characters')
         return v.lower()
-    
-    @validator('password')
-    def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('Password must be at least 8 characters long')
-        return v
 
 class UserLogin(BaseModel):
     """User login model"""
@@ -42,9 +44,11 @@ class UserUpdate(BaseModel):
     full_name: Optional[str] = Field(None, max_length=255)
     age: Optional[int] = Field(None, ge=13, le=120)
     occupation: Optional[str] = Field(None, max_length=100)
-    income_level: Optional[str] = Field(None, regex="^(low|medium|high)$")
-    risk_tolerance: Optional[str] = Field(None, regex="^(low|medium|high)$")
+    income_level: Optional[Level] = None
+    risk_tolerance: Optional[Level] = None
     financial_goals: Optional[List[dict]] = None
+    
+    model_config = ConfigDict(str_strip_whitespace=True)
 
 class UserResponse(UserBase):
     """User response model"""
@@ -54,8 +58,7 @@ class UserResponse(UserBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class TokenResponse(BaseModel):
     """Token response model"""
@@ -69,12 +72,6 @@ class PasswordChange(BaseModel):
     """Password change model"""
     current_password: str
     new_password: str = Field(..., min_length=8, max_length=128)
-    
-    @validator('new_password')
-    def validate_new_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('New password must be at least 8 characters long')
-        return v
 
 class UserProfile(BaseModel):
     """User profile model"""
@@ -91,8 +88,10 @@ class FinancialGoalCreate(BaseModel):
     target_amount: float = Field(..., gt=0)
     currency: str = Field(default="USD", max_length=3)
     target_date: Optional[datetime] = None
-    goal_type: str = Field(..., regex="^(savings|investment|debt_payoff|emergency_fund|retirement|other)$")
-    priority: str = Field(default="medium", regex="^(low|medium|high)$")
+    goal_type: GoalType
+    priority: Level = "medium"
+    
+    model_config = ConfigDict(str_strip_whitespace=True)
 
 class FinancialGoalUpdate(BaseModel):
     """Financial goal update model"""
@@ -101,9 +100,11 @@ class FinancialGoalUpdate(BaseModel):
     target_amount: Optional[float] = Field(None, gt=0)
     currency: Optional[str] = Field(None, max_length=3)
     target_date: Optional[datetime] = None
-    goal_type: Optional[str] = Field(None, regex="^(savings|investment|debt_payoff|emergency_fund|retirement|other)$")
-    priority: Optional[str] = Field(None, regex="^(low|medium|high)$")
-    status: Optional[str] = Field(None, regex="^(active|completed|paused|cancelled)$")
+    goal_type: Optional[GoalType] = None
+    priority: Optional[Level] = None
+    status: Optional[GoalStatus] = None
+    
+    model_config = ConfigDict(str_strip_whitespace=True)
 
 class FinancialGoalResponse(BaseModel):
     """Financial goal response model"""
@@ -121,8 +122,7 @@ class FinancialGoalResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class TransactionCreate(BaseModel):
     """Transaction creation model"""
@@ -132,8 +132,10 @@ class TransactionCreate(BaseModel):
     subcategory: Optional[str] = Field(None, max_length=100)
     description: Optional[str] = None
     transaction_date: datetime
-    transaction_type: str = Field(..., regex="^(income|expense|transfer)$")
+    transaction_type: TransactionType
     tags: Optional[List[str]] = None
+    
+    model_config = ConfigDict(str_strip_whitespace=True)
 
 class TransactionUpdate(BaseModel):
     """Transaction update model"""
@@ -143,8 +145,10 @@ class TransactionUpdate(BaseModel):
     subcategory: Optional[str] = Field(None, max_length=100)
     description: Optional[str] = None
     transaction_date: Optional[datetime] = None
-    transaction_type: Optional[str] = Field(None, regex="^(income|expense|transfer)$")
+    transaction_type: Optional[TransactionType] = None
     tags: Optional[List[str]] = None
+    
+    model_config = ConfigDict(str_strip_whitespace=True)
 
 class TransactionResponse(BaseModel):
     """Transaction response model"""
@@ -160,8 +164,7 @@ class TransactionResponse(BaseModel):
     tags: Optional[List[str]]
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class FinancialProfileUpdate(BaseModel):
     """Financial profile update model"""
@@ -187,15 +190,16 @@ class FinancialProfileResponse(BaseModel):
     financial_health_score: float
     last_updated: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserPreferences(BaseModel):
     """User preferences model"""
     notification_settings: Optional[dict] = None
     privacy_settings: Optional[dict] = None
     ui_preferences: Optional[dict] = None
-    financial_goals_visibility: Optional[str] = Field(None, regex="^(public|private|friends_only)$")
+    financial_goals_visibility: Optional[Visibility] = None
+    
+    model_config = ConfigDict(str_strip_whitespace=True)
 
 class UserStats(BaseModel):
     """User statistics model"""
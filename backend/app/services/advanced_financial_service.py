@@ -4,43 +4,95 @@ Provides sophisticated financial analysis, predictions, and insights
 """
 
 import asyncio
+import bisect
+import hashlib
+import heapq
+import io
 import logging
+import operator
+import zlib
+from collections import defaultdict
 from typing import Dict, List, Optional, Any, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime
+from cachetools import TTLCache
+import msgspec
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestClassifier
 from sklearn.cluster import KMeans
 from sklearn.decomposition import PCA
-import yfinance as yf
-import pandas_ta as ta
+import requests
 from scipy import stats
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 import json
 
+from app.core.config import settings
+from app.core.file_cache import FileCache
+from app.models.structs import SummaryMetricsMsg
+from app.services.kernels import ema_last, rsi_last, worst_drawdown, zscore_any_outlier
+
 logger = logging.getLogger(__name__)
 
+# Columns of the spending feature matrix: day_of_week, day_of_month, month, is_weekend,
+# prev_week_total, prev_week_count, category_encoded, income_level, age_group
+SPENDING_FEATURE_COUNT = 9
+
+# Feature encodings for the user profile
+_INCOME_LEVEL_CODES = {'low': 0, 'medium': 1, 'high': 2}
+_AGE_GROUP_BOUNDS = (25, 35, 50)
+# Categories hash into this many ids; crc32 is unsalted, so ids survive restarts
+_CATEGORY_BUCKETS = 1024
+
+# Below this many transactions one fused Python loop beats NumPy/pandas setup costs
+_SUMMARY_LOOP_MAX = 256
+
+# Shared HTTP session so every Ticker reuses pooled keep-alive connections to Yahoo
+_YF_SESSION = requests.Session()
+
+def _trailing_mean(values: np.ndarray, window: int) -> float:
+    """Mean of the last window values; NaN when there are fewer, like rolling().mean()"""
+    if values.size < window:
+        return float("nan")
+    return float(values[-window:].mean())
+
+def _sorted_quantile(sorted_values: np.ndarray, q: float) -> float:
+    """Linear-interpolated quantile of an already sorted array, like np.quantile"""
+    position = q * (sorted_values.size - 1)
+    lower = int(position)
+    upper = min(lower + 1, sorted_values.size - 1)
+    return float(sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower))
+
+def _r2_from_mse(mse: float, y: np.ndarray) -> float:
+    """Coefficient of determination from a precomputed MSE, matching sklearn's score()"""
+    variance = float(y.var())
+    if variance == 0:
+        return 1.0 if mse == 0 else 0.0
+    return 1.0 - mse / variance
+
 class AdvancedFinancialService:
     """Advanced financial analysis service with AI/ML capabilities"""
     
+    # Seasonal spending factors indexed by month (index 0 unused): New Year spending in
+    # January, post-holiday lull in February, holiday preparation and spending in Nov/Dec
+    _SEASONAL_FACTORS = (1.0, 1.1, 0.9, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.2, 1.3)
+    
     def __init__(self):
         """Initialize the advanced financial service"""
         try:
             # Initialize ML models
-            self.spending_predictor = RandomForestRegressor(n_estimators=100, random_state=42)
+            self.spending_predictor = HistGradientBoostingRegressor(
+                max_iter=100, learning_rate=0.1, max_leaf_nodes=31, early_stopping=True, random_state=42
+            )
             self.risk_classifier = RandomForestClassifier(n_estimators=100, random_state=42)
             self.anomaly_detector = RandomForestClassifier(n_estimators=50, random_state=42)
             
-            # Data preprocessing
-            self.scaler = StandardScaler()
-            self.label_encoder = LabelEncoder()
+            # Fitted (data fingerprint, model) per user; refit hourly or on new data
+            self._spending_models: TTLCache = TTLCache(maxsize=1024, ttl=3600)
             
             # Market data cache
-            self.market_cache = {}
-            self.cache_expiry = {}
+            self.market_cache: TTLCache = TTLCache(maxsize=256, ttl=300)  # 5 minutes
+            # Raw Yahoo responses on disk, so restarts and replicas skip repeat fetches
+            self.market_file_cache = FileCache(settings.MARKET_CACHE_DIR)
             
             # Financial indicators
             self.technical_indicators = [
@@ -99,29 +151,32 @@ class AdvancedFinancialService:
             if not returns_data:
                 return {"error": "Insufficient data for risk calculation"}
             
-            # Convert to numpy arrays
-            returns_array = np.array(returns_data)
-            weights_array = np.array(weights)
+            # Convert to numpy arrays: (n_assets, T) returns and (n_assets,) weights
+            returns_array = np.ascontiguousarray(returns_data, dtype=np.float64)
+            weights_array = np.asarray(weights, dtype=np.float64)
+            
+            # Weighted portfolio return series, computed once and reused below
+            portfolio_returns = weights_array @ returns_array
             
             # Calculate risk metrics
-            portfolio_return = np.sum(returns_array * weights_array)
-            portfolio_volatility = np.sqrt(
-                np.dot(weights_array.T, np.dot(np.cov(returns_array), weights_array))
-            )
+            portfolio_return = portfolio_returns.mean()
+            # np.cov returns a 0-d array for a single asset; keep it (A, A) for the quadratic form
+            covariance = np.atleast_2d(np.cov(returns_array))
+            portfolio_volatility = np.sqrt(weights_array @ covariance @ weights_array)
             
             # Sharpe ratio (assuming risk-free rate of 2%)
             risk_free_rate = 0.02
             sharpe_ratio = (portfolio_return - risk_free_rate) / portfolio_volatility if portfolio_volatility > 0 else 0
             
-            # Value at Risk (VaR) - 95% confidence
-            portfolio_returns = np.sum(returns_array * weights_array, axis=0)
-            var_95 = np.percentile(portfolio_returns, 5)
+            # Value at Risk (VaR) and expected shortfall, sharing one sort of the returns
+            sorted_returns = np.sort(portfolio_returns)
+            var_95 = _sorted_quantile(sorted_returns, 0.05)
+            var_99 = _sorted_quantile(sorted_returns, 0.01)
+            tail = sorted_returns[:np.searchsorted(sorted_returns, var_95, side="right")]
+            cvar_95 = tail.mean() if tail.size else var_95
             
-            # Maximum drawdown
-            cumulative_returns = np.cumprod(1 + portfolio_returns)
-            running_max = np.maximum.accumulate(cumulative_returns)
-            drawdown = (cumulative_returns - running_max) / running_max
-            max_drawdown = np.min(drawdown)
+            # Maximum drawdown in a single pass
+            max_drawdown = worst_drawdown(portfolio_returns)
             
             # Beta calculation (if market data available)
             beta = await self._calculate_portfolio_beta(returns_array, weights_array)
@@ -131,6 +186,8 @@ class AdvancedFinancialService:
                 "portfolio_volatility": float(portfolio_volatility),
                 "sharpe_ratio": float(sharpe_ratio),
                 "var_95": float(var_95),
+                "var_99": float(var_99),
+                "cvar_95": float(cvar_95),
                 "max_drawdown": float(max_drawdown),
                 "beta": float(beta),
                 "diversification_score": self._calculate_diversification_score(assets)
@@ -185,11 +242,12 @@ class AdvancedFinancialService:
                 return {"error": "Insufficient historical data for prediction"}
             
             # Prepare features for ML model
-            features = await self._extract_spending_features(historical_data, user_profile)
+            X, y = await self._extract_spending_features(historical_data, user_profile)
             
             # Train model if we have enough data
-            if len(features) > 50:
-                predictions = await self._train_and_predict_spending(features)
+            if len(y) > 50:
+                user_key = user_profile.get('user_id', user_profile.get('id'))
+                predictions = await self._train_and_predict_spending(X, y, user_key)
             else:
                 predictions = await self._simple_spending_forecast(historical_data)
             
@@ -199,7 +257,7 @@ class AdvancedFinancialService:
             return {
                 "predictions": predictions,
                 "insights": insights,
-                "confidence": 0.85 if len(features) > 50 else 0.70,
+                "confidence": 0.85 if len(y) > 50 else 0.70,
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -211,89 +269,97 @@ class AdvancedFinancialService:
         self, 
         historical_data: List[Dict], 
         user_profile: Dict
-    ) -> List[Dict]:
-        """Extract features for ML model from spending data"""
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Extract an (N, F) feature matrix and N target amounts from spending data"""
         try:
-            features = []
+            n = len(historical_data)
+            rows = n - 7  # Skip first week
+            if rows <= 0:
+                return np.empty((0, SPENDING_FEATURE_COUNT), dtype=np.float32), np.empty(0)
+            
+            now = datetime.now()
+            # One DatetimeIndex over the rows that become features; its field accessors are C loops
+            dates = pd.DatetimeIndex([t.get('date', now) for t in historical_data[7:]])
+            amounts = np.fromiter(
+                (t.get('amount', 0) for t in historical_data), dtype=np.float64, count=n
+            )
+            category_ids = np.fromiter(
+                (self._encode_category(t.get('category', 'other')) for t in historical_data),
+                dtype=np.int32,
+                count=n
+            )
             
-            for i, transaction in enumerate(historical_data):
-                if i < 7:  # Skip first week
-                    continue
-                
-                # Get previous week's data
-                prev_week = historical_data[max(0, i-7):i]
-                
-                feature_vector = {
-                    'day_of_week': transaction.get('date', datetime.now()).weekday(),
-                    'day_of_month': transaction.get('date', datetime.now()).day,
-                    'month': transaction.get('date', datetime.now()).month,
-                    'is_weekend': transaction.get('date', datetime.now()).weekday() >= 5,
-                    'prev_week_total': sum(t.get('amount', 0) for t in prev_week),
-                    'prev_week_count': len(prev_week),
-                    'category_encoded': hash(transaction.get('category', 'other')) % 100,
-                    'amount': abs(transaction.get('amount', 0)),
-                    'income_level': self._encode_income_level(user_profile.get('income_level', 'medium')),
-                    'age_group': self._encode_age_group(user_profile.get('age', 30))
-                }
-                
-                features.append(feature_vector)
+            # Previous week's total from a running sum: row i covers rows i-7 .. i-1
+            running = np.concatenate(([0.0], np.cumsum(amounts)))
+            day_of_week = dates.dayofweek.to_numpy(np.int8)
+            
+            X = np.empty((rows, SPENDING_FEATURE_COUNT), dtype=np.float32)
+            X[:, 0] = day_of_week
+            X[:, 1] = dates.day.to_numpy(np.int8)
+            X[:, 2] = dates.month.to_numpy(np.int8)
+            X[:, 3] = day_of_week >= 5
+            X[:, 4] = running[7:n] - running[:rows]
+            X[:, 5] = 7  # prev_week_count
+            X[:, 6] = category_ids[7:]
+            X[:, 7] = self._encode_income_level(user_profile.get('income_level', 'medium'))
+            X[:, 8] = self._encode_age_group(user_profile.get('age', 30))
             
-            return features
+            return X, np.abs(amounts[7:])
             
         except Exception as e:
             logger.error(f"Feature extraction failed: {e}")
-            return []
+            return np.empty((0, SPENDING_FEATURE_COUNT), dtype=np.float32), np.empty(0)
+    
+    def _encode_category(self, category: str) -> int:
+        """Encode category for ML model as a stable bucketed hash"""
+        return zlib.crc32(category.encode()) % _CATEGORY_BUCKETS
     
     def _encode_income_level(self, income_level: str) -> int:
         """Encode income level for ML model"""
-        encoding = {'low': 0, 'medium': 1, 'high': 2}
-        return encoding.get(income_level.lower(), 1)
+        return _INCOME_LEVEL_CODES.get(income_level.lower(), 1)
     
     def _encode_age_group(self, age: int) -> int:
-        """Encode age group for ML model"""
-        if age < 25:
-            return 0
-        elif age < 35:
-            return 1
-        elif age < 50:
-            return 2
-        else:
-            return 3
+        """Encode age group for ML model: <25, 25-34, 35-49, 50+"""
+        return bisect.bisect_right(_AGE_GROUP_BOUNDS, age)
     
     async def _train_and_predict_spending(
         self, 
-        features: List[Dict]
+        X: np.ndarray,
+        y: np.ndarray,
+        user_key: Optional[Any] = None
     ) -> Dict[str, Any]:
         """Train ML model and make predictions"""
         try:
-            # Prepare data
-            X = []
-            y = []
-            
-            for i, feature in enumerate(features[:-1]):  # Use all but last for training
-                X.append([v for k, v in feature.items() if k != 'amount'])
-                y.append(feature['amount'])
+            # Use all but last for training
+            X_array = X[:-1]
+            y_array = y[:-1]
             
-            # Train model
-            X_array = np.array(X)
-            y_array = np.array(y)
+            # Reuse this user's fitted model unless the training data has changed
+            fingerprint = hashlib.blake2b(X_array.tobytes() + y_array.tobytes(), digest_size=16).digest()
+            cached = self._spending_models.get(user_key) if user_key is not None else None
             
-            # Scale features
-            X_scaled = self.scaler.fit_transform(X_array)
-            
-            # Train model
-            self.spending_predictor.fit(X_scaled, y_array)
+            if cached is not None and cached[0] == fingerprint:
+                _, model, mse, accuracy = cached
+            else:
+                # Train model; trees are scale-invariant, so features go in unscaled
+                model = clone(self.spending_predictor)
+                model.fit(X_array, y_array)
+                
+                # One pass over the training set gives both the residual MSE and R^2
+                residuals = y_array - model.predict(X_array)
+                mse = float(np.mean(residuals ** 2))
+                accuracy = _r2_from_mse(mse, y_array)
+                
+                if user_key is not None:
+                    self._spending_models[user_key] = (fingerprint, model, mse, accuracy)
             
             # Make prediction for next period
-            last_features = [v for k, v in features[-1].items() if k != 'amount']
-            last_features_scaled = self.scaler.transform([last_features])
-            
-            predicted_amount = self.spending_predictor.predict(last_features_scaled)[0]
+            predicted_amount = float(model.predict(X[-1:])[0])
             
             return {
-                "next_period_prediction": float(predicted_amount),
-                "model_accuracy": float(self.spending_predictor.score(X_scaled, y_array)),
-                "prediction_interval": self._calculate_prediction_interval(X_scaled, y_array, last_features_scaled)
+                "next_period_prediction": predicted_amount,
+                "model_accuracy": accuracy,
+                "prediction_interval": self._calculate_prediction_interval(predicted_amount, mse)
             }
             
         except Exception as e:
@@ -302,24 +368,19 @@ class AdvancedFinancialService:
     
     def _calculate_prediction_interval(
         self, 
-        X_train: np.ndarray, 
-        y_train: np.ndarray, 
-        X_pred: np.ndarray
+        prediction: float,
+        mse: float
     ) -> Dict[str, float]:
         """Calculate prediction interval for uncertainty quantification"""
         try:
-            # Simple approach: use standard error of prediction
-            y_pred = self.spending_predictor.predict(X_train)
-            residuals = y_train - y_pred
-            mse = np.mean(residuals**2)
-            
-            # 95% prediction interval
+            # Simple approach: use standard error of prediction from the training residuals
             std_error = np.sqrt(mse)
             interval_95 = 1.96 * std_error
             
+            # 95% prediction interval around the prediction itself
             return {
-                "lower_bound": float(y_pred[0] - interval_95),
-                "upper_bound": float(y_pred[0] + interval_95),
+                "lower_bound": float(prediction - interval_95),
+                "upper_bound": float(prediction + interval_95),
                 "confidence_level": 0.95
             }
             
@@ -334,8 +395,13 @@ class AdvancedFinancialService:
         """Simple forecasting when insufficient data for ML"""
         try:
             # Calculate moving average
-            amounts = [abs(t.get('amount', 0)) for t in historical_data[-7:]]  # Last week
-            moving_avg = np.mean(amounts)
+            last_week = historical_data[-7:]
+            amounts = np.fromiter(
+                (abs(t.get('amount', 0)) for t in last_week),
+                dtype=np.float64,
+                count=len(last_week)
+            )
+            moving_avg = amounts.mean()
             
             # Add seasonal adjustment
             current_month = datetime.now().month
@@ -355,23 +421,7 @@ class AdvancedFinancialService:
     
     def _get_seasonal_factor(self, month: int) -> float:
         """Get seasonal adjustment factor for spending"""
-        # Simple seasonal factors (could be more sophisticated)
-        seasonal_factors = {
-            1: 1.1,   # January - New Year spending
-            2: 0.9,   # February - Post-holiday lull
-            3: 1.0,   # March - Normal
-            4: 1.0,   # April - Normal
-            5: 1.0,   # May - Normal
-            6: 1.0,   # June - Normal
-            7: 1.0,   # July - Normal
-            8: 1.0,   # August - Normal
-            9: 1.0,   # September - Normal
-            10: 1.0,  # October - Normal
-            11: 1.2,  # November - Holiday preparation
-            12: 1.3   # December - Holiday spending
-        }
-        
-        return seasonal_factors.get(month, 1.0)
+        return self._SEASONAL_FACTORS[month]
     
     async def generate_financial_insights(
         self, 
@@ -384,31 +434,37 @@ class AdvancedFinancialService:
             
             # Spending analysis
             if user_data.get('transactions'):
-                spending_insights = await self._analyze_spending_behavior(
-                    user_data['transactions']
-                )
-                insights.extend(spending_insights)
+                try:
+                    insights.extend(await self._analyze_spending_behavior(user_data['transactions']))
+                except Exception as e:
+                    logger.error(f"Spending insight analysis failed: {e}")
             
             # Savings analysis
             if user_data.get('income') and user_data.get('expenses'):
-                savings_insights = await self._analyze_savings_opportunities(
-                    user_data['income'],
-                    user_data['expenses']
-                )
-                insights.extend(savings_insights)
+                try:
+                    insights.extend(await self._analyze_savings_opportunities(
+                        user_data['income'],
+                        user_data['expenses']
+                    ))
+                except Exception as e:
+                    logger.error(f"Savings insight analysis failed: {e}")
             
             # Investment analysis
             if user_data.get('portfolio'):
-                investment_insights = await self._analyze_investment_strategy(
-                    user_data['portfolio'],
-                    user_data.get('profile', {})
-                )
-                insights.extend(investment_insights)
+                try:
+                    insights.extend(await self._analyze_investment_strategy(
+                        user_data['portfolio'],
+                        user_data.get('profile', {})
+                    ))
+                except Exception as e:
+                    logger.error(f"Investment insight analysis failed: {e}")
             
             # Market context
             if market_data:
-                market_insights = await self._analyze_market_context(market_data)
-                insights.extend(market_insights)
+                try:
+                    insights.extend(await self._analyze_market_context(market_data))
+                except Exception as e:
+                    logger.error(f"Market insight analysis failed: {e}")
             
             # Sort by priority and return top insights
             insights.sort(key=lambda x: x.get('priority_score', 0), reverse=True)
@@ -426,30 +482,24 @@ class AdvancedFinancialService:
         try:
             insights = []
             
-            # Categorize transactions
-            categories = {}
-            for transaction in transactions:
-                category = transaction.get('category', 'Other')
-                amount = abs(transaction.get('amount', 0))
-                
-                if category not in categories:
-                    categories[category] = {'total': 0, 'count': 0}
-                
-                categories[category]['total'] += amount
-                categories[category]['count'] += 1
+            # Categorize transactions: per-category totals in one grouped pass
+            amounts = np.abs(np.fromiter(
+                (t.get('amount', 0) for t in transactions),
+                dtype=np.float64,
+                count=len(transactions)
+            ))
+            categories = pd.Series(amounts).groupby(
+                [t.get('category', 'Other') for t in transactions], sort=False
+            ).sum()
             
             # Find top spending categories
-            top_categories = sorted(
-                categories.items(),
-                key=lambda x: x[1]['total'],
-                reverse=True
-            )[:3]
+            top_categories = categories.nlargest(3)
             
             # Generate insights
-            if top_categories:
-                top_category, top_data = top_categories[0]
-                total_spending = sum(cat['total'] for cat in categories.values())
-                top_percentage = (top_data['total'] / total_spending) * 100
+            if not top_categories.empty:
+                top_category = top_categories.index[0]
+                total_spending = categories.sum()
+                top_percentage = (top_categories.iloc[0] / total_spending) * 100
                 
                 if top_percentage > 40:
                     insights.append({
@@ -484,20 +534,14 @@ class AdvancedFinancialService:
             if len(transactions) < 10:
                 return False
             
-            amounts = [abs(t.get('amount', 0)) for t in transactions]
-            
-            # Use Z-score method for anomaly detection
-            mean_amount = np.mean(amounts)
-            std_amount = np.std(amounts)
-            
-            if std_amount == 0:
-                return False
-            
-            # Check if any transaction is more than 2 standard deviations from mean
-            z_scores = [(amount - mean_amount) / std_amount for amount in amounts]
-            anomalies = [abs(z) > 2 for z in z_scores]
+            amounts = np.fromiter(
+                (abs(t.get('amount', 0)) for t in transactions),
+                dtype=np.float64,
+                count=len(transactions)
+            )
             
-            return any(anomalies)
+            # Z-score method: is any transaction more than 2 standard deviations from mean
+            return bool(zscore_any_outlier(amounts, 2.0))
             
         except Exception as e:
             logger.error(f"Anomaly detection failed: {e}")
@@ -648,43 +692,46 @@ class AdvancedFinancialService:
         """Get real-time market data for financial analysis"""
         try:
             market_data = {}
+            uncached = []
+            
+            for symbol in dict.fromkeys(symbols):
+                # Expired entries are dropped by the cache itself
+                cached = self.market_cache.get(symbol)
+                if cached is not None:
+                    market_data[symbol] = cached
+                else:
+                    uncached.append(symbol)
+            
+            # yfinance blocks on HTTP, so fetch every missing symbol concurrently on threads
+            results = await asyncio.gather(
+                *(asyncio.to_thread(self._fetch_symbol, symbol) for symbol in uncached),
+                return_exceptions=True
+            )
             
-            for symbol in symbols:
-                if symbol in self.market_cache:
-                    # Check if cache is still valid (5 minutes)
-                    if datetime.now() < self.cache_expiry.get(symbol, datetime.min):
-                        market_data[symbol] = self.market_cache[symbol]
-                        continue
+            for symbol, result in zip(uncached, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to fetch data for {symbol}: {result}")
+                    continue
                 
-                # Fetch new data
-                try:
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
-                    
-                    # Get historical data for technical analysis
-                    hist = ticker.history(period="1mo")
-                    
-                    if not hist.empty:
-                        # Calculate technical indicators
-                        technical_data = await self._calculate_technical_indicators(hist)
-                        
-                        market_data[symbol] = {
-                            "current_price": info.get('currentPrice', 0),
-                            "change_percent": info.get('regularMarketChangePercent', 0),
-                            "market_cap": info.get('marketCap', 0),
-                            "pe_ratio": info.get('trailingPE', 0),
-                            "dividend_yield": info.get('dividendYield', 0),
-                            "technical_indicators": technical_data,
-                            "last_updated": datetime.now().isoformat()
-                        }
-                        
-                        # Cache the data
-                        self.market_cache[symbol] = market_data[symbol]
-                        self.cache_expiry[symbol] = datetime.now() + timedelta(minutes=5)
-                        
-                except Exception as e:
-                    logger.error(f"Failed to fetch data for {symbol}: {e}")
+                info, hist = result
+                if hist.empty:
                     continue
+                
+                # Calculate technical indicators
+                technical_data = await self._calculate_technical_indicators(hist)
+                
+                market_data[symbol] = {
+                    "current_price": info.get('currentPrice', 0),
+                    "change_percent": info.get('regularMarketChangePercent', 0),
+                    "market_cap": info.get('marketCap', 0),
+                    "pe_ratio": info.get('trailingPE', 0),
+                    "dividend_yield": info.get('dividendYield', 0),
+                    "technical_indicators": technical_data,
+                    "last_updated": datetime.now().isoformat()
+                }
+                
+                # Cache the data
+                self.market_cache[symbol] = market_data[symbol]
             
             return market_data
             
@@ -692,27 +739,48 @@ class AdvancedFinancialService:
             logger.error(f"Market data fetch failed: {e}")
             return {}
     
+    def _fetch_symbol(self, symbol: str) -> Tuple[Dict[str, Any], pd.DataFrame]:
+        """Fetch quote info and a month of history for technical analysis (blocking)"""
+        # Imported on first use; yfinance is slow to import and only this path needs it
+        import yfinance as yf
+        
+        ticker = yf.Ticker(symbol, session=_YF_SESSION)
+        info = self.market_file_cache.get_or_fetch(
+            symbol, "info", {}, lambda: ticker.info, settings.MARKET_INFO_TTL
+        )
+        hist_json = self.market_file_cache.get_or_fetch(
+            symbol,
+            "history",
+            {"period": "1mo"},
+            lambda: ticker.history(period="1mo").to_json(orient="split", date_format="iso"),
+            settings.MARKET_HISTORY_TTL
+        )
+        return info, pd.read_json(io.StringIO(hist_json), orient="split")
+    
     async def _calculate_technical_indicators(self, hist_data: pd.DataFrame) -> Dict[str, float]:
         """Calculate technical indicators for market analysis"""
         try:
             indicators = {}
             
-            # Simple Moving Averages
-            indicators['sma_20'] = float(hist_data['Close'].rolling(window=20).mean().iloc[-1])
-            indicators['sma_50'] = float(hist_data['Close'].rolling(window=50).mean().iloc[-1])
+            # Simple Moving Averages: only the latest value is needed, so average the tail
+            close = hist_data['Close'].to_numpy(dtype=np.float64)
+            indicators['sma_20'] = _trailing_mean(close, 20)
+            indicators['sma_50'] = _trailing_mean(close, 50)
             
-            # RSI
-            rsi = ta.rsi(hist_data['Close'], length=14)
-            indicators['rsi'] = float(rsi.iloc[-1]) if not rsi.empty else 50.0
+            # RSI (14, Wilder smoothing)
+            indicators['rsi'] = float(rsi_last(close, 14))
             
-            # MACD
-            macd = ta.macd(hist_data['Close'])
-            indicators['macd'] = float(macd.iloc[-1]) if not macd.empty else 0.0
+            # MACD line (EMA 12 - EMA 26)
+            indicators['macd'] = float(ema_last(close, 12) - ema_last(close, 26))
             
-            # Bollinger Bands
-            bb = ta.bbands(hist_data['Close'])
-            indicators['bb_upper'] = float(bb['BBU_20_2.0'].iloc[-1]) if not bb.empty else 0.0
-            indicators['bb_lower'] = float(bb['BBL_20_2.0'].iloc[-1]) if not bb.empty else 0.0
+            # Bollinger Bands (20, 2 population std devs)
+            if close.size >= 20:
+                window = close[-20:]
+                middle, spread = window.mean(), 2.0 * window.std()
+                indicators['bb_upper'] = float(middle + spread)
+                indicators['bb_lower'] = float(middle - spread)
+            else:
+                indicators['bb_upper'] = indicators['bb_lower'] = float("nan")
             
             return indicators
             
@@ -740,12 +808,12 @@ class AdvancedFinancialService:
             # Generate summary metrics
             if user_data.get('transactions'):
                 summary = await self._generate_summary_metrics(user_data['transactions'])
-                report["summary"] = summary
+                if summary is not None:
+                    report["summary"] = msgspec.structs.asdict(summary)
             
             # Generate detailed analysis
             if report_type == "comprehensive":
-                detailed = await self._generate_detailed_analysis(user_data)
-                report["detailed_analysis"] = detailed
+                report["detailed_analysis"] = await self._generate_detailed_analysis(user_data)
             
             # Generate recommendations
             recommendations = await self.generate_financial_insights(user_data)
@@ -764,42 +832,61 @@ class AdvancedFinancialService:
             logger.error(f"Financial report generation failed: {e}")
             return {"error": f"Report generation failed: {str(e)}"}
     
-    async def _generate_summary_metrics(self, transactions: List[Dict]) -> Dict[str, Any]:
+    async def _generate_summary_metrics(self, transactions: List[Dict]) -> Optional[SummaryMetricsMsg]:
         """Generate summary financial metrics"""
         try:
-            total_spent = sum(abs(t.get('amount', 0)) for t in transactions)
-            total_income = sum(t.get('amount', 0) for t in transactions if t.get('amount', 0) > 0)
-            total_expenses = sum(abs(t.get('amount', 0)) for t in transactions if t.get('amount', 0) < 0)
-            
-            # Categorize transactions
-            categories = {}
-            for transaction in transactions:
-                category = transaction.get('category', 'Other')
-                amount = abs(transaction.get('amount', 0))
+            if len(transactions) <= _SUMMARY_LOOP_MAX:
+                total_spent, total_income, total_expenses, categories = self._summarize_transactions(transactions)
+                top_categories = heapq.nlargest(5, categories.items(), key=operator.itemgetter(1))
+            else:
+                amounts = np.fromiter(
+                    (t.get('amount', 0) for t in transactions),
+                    dtype=np.float64,
+                    count=len(transactions)
+                )
+                categories = [t.get('category', 'Other') for t in transactions]
                 
-                if category not in categories:
-                    categories[category] = 0
-                categories[category] += amount
-            
-            top_categories = sorted(
-                categories.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:5]
-            
-            return {
-                "total_transactions": len(transactions),
-                "total_spent": total_spent,
-                "total_income": total_income,
-                "total_expenses": total_expenses,
-                "net_flow": total_income - total_expenses,
-                "top_spending_categories": top_categories,
-                "average_transaction": total_spent / len(transactions) if transactions else 0
-            }
+                abs_amounts = np.abs(amounts)
+                total_spent = float(abs_amounts.sum())
+                total_income = float(amounts[amounts > 0].sum())
+                total_expenses = float(abs_amounts[amounts < 0].sum())
+                
+                # Hash-factorize in first-seen order, then a stable sort so ties rank as before
+                codes, uniques = pd.factorize(pd.Series(categories, dtype=object), use_na_sentinel=False)
+                by_category = np.bincount(codes, weights=abs_amounts, minlength=len(uniques))
+                top_categories = [
+                    (uniques[i], float(by_category[i]))
+                    for i in np.argsort(-by_category, kind='stable')[:5]
+                ]
+            
+            return SummaryMetricsMsg(
+                total_transactions=len(transactions),
+                total_spent=total_spent,
+                total_income=total_income,
+                total_expenses=total_expenses,
+                net_flow=total_income - total_expenses,
+                top_spending_categories=top_categories,
+                average_transaction=total_spent / len(transactions) if transactions else 0.0
+            )
             
         except Exception as e:
             logger.error(f"Summary metrics generation failed: {e}")
-            return {}
+            return None
+    
+    def _summarize_transactions(self, transactions: List[Dict]) -> Tuple[float, float, float, Dict[Any, float]]:
+        """Spent, income and expense totals plus per-category spend in a single pass"""
+        total_spent = total_income = total_expenses = 0.0
+        categories = defaultdict(float)
+        for t in transactions:
+            amount = float(t.get('amount', 0))
+            spent = abs(amount)
+            total_spent += spent
+            if amount > 0:
+                total_income += amount
+            elif amount < 0:
+                total_expenses += spent
+            categories[t.get('category', 'Other')] += spent
+        return total_spent, total_income, total_expenses, categories
     
     async def _generate_detailed_analysis(self, user_data: Dict) -> Dict[str, Any]:
         """Generate detailed financial analysis"""
@@ -808,26 +895,32 @@ class AdvancedFinancialService:
             
             # Spending analysis
             if user_data.get('transactions'):
-                spending_analysis = await self._analyze_spending_behavior(
-                    user_data['transactions']
-                )
-                analysis["spending"] = spending_analysis
+                try:
+                    analysis["spending"] = await self._analyze_spending_behavior(
+                        user_data['transactions']
+                    )
+                except Exception as e:
+                    logger.error(f"Detailed spending analysis failed: {e}")
             
             # Savings analysis
             if user_data.get('income') and user_data.get('expenses'):
-                savings_analysis = await self._analyze_savings_opportunities(
-                    user_data['income'],
-                    user_data['expenses']
-                )
-                analysis["savings"] = savings_analysis
+                try:
+                    analysis["savings"] = await self._analyze_savings_opportunities(
+                        user_data['income'],
+                        user_data['expenses']
+                    )
+                except Exception as e:
+                    logger.error(f"Detailed savings analysis failed: {e}")
             
             # Investment analysis
             if user_data.get('portfolio'):
-                investment_analysis = await self._analyze_investment_strategy(
-                    user_data['portfolio'],
-                    user_data.get('profile', {})
-                )
-                analysis["investment"] = investment_analysis
+                try:
+                    analysis["investment"] = await self._analyze_investment_strategy(
+                        user_data['portfolio'],
+                        user_data.get('profile', {})
+                    )
+                except Exception as e:
+                    logger.error(f"Detailed investment analysis failed: {e}")
             
             return analysis
             
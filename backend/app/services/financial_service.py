@@ -3,21 +3,69 @@ Financial service for Personal Finance Chatbot
 Handles financial calculations, analysis, and insights
 """
 
+import bisect
 import logging
-from typing import Dict, List, Optional, Any
+import math
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
-from decimal import Decimal, ROUND_HALF_UP
+from cachetools import LRUCache
+
+from app.models.structs import HealthScoreMsg
+from app.services.kernels import zscore_outliers
 
 logger = logging.getLogger(__name__)
 
+# Score tables: bisect_right for "at least" cut-offs, bisect_left for "at most"
+_SAVINGS_RATE_CUTOFFS = (0.05, 0.1, 0.15, 0.2, 0.3)
+_SAVINGS_RATE_SCORES = (0, 20, 40, 60, 80, 100)
+_DEBT_RATIO_CUTOFFS = (0.28, 0.36, 0.43, 0.50, 0.60)
+_DEBT_RATIO_SCORES = (100, 80, 60, 40, 20, 0)
+_EMERGENCY_MONTHS_CUTOFFS = (1, 2, 3, 4, 6)
+_EMERGENCY_MONTHS_SCORES = (0, 20, 40, 60, 80, 100)
+_ASSET_CLASS_SCORES = (0, 20, 40, 60, 80, 100)  # indexed by asset class count, capped at 5
+_BUDGET_VARIANCE_CUTOFFS = (0.1, 0.2, 0.3, 0.5)
+_BUDGET_VARIANCE_SCORES = (100, 80, 60, 40, 20)
+_GRADE_CUTOFFS = (40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90)
+_GRADES = ("F", "D", "D+", "C-", "C", "C+", "B-", "B", "B+", "A-", "A", "A+")
+
+# Period x category grids up to this size are aggregated densely instead of via np.unique
+_DENSE_GROUP_MAX_CATEGORIES = 16
+_DENSE_GROUP_MAX_CELLS = 1 << 16
+
+_HEALTH_WEIGHTS = {
+    "savings_rate": 0.25,
+    "debt_to_income": 0.20,
+    "emergency_fund": 0.20,
+    "investment_diversity": 0.15,
+    "budget_adherence": 0.20
+}
+
+# Advice shown for each component scoring below 60
+_HEALTH_RECOMMENDATIONS = (
+    ("savings_rate", "Increase your savings rate by reducing expenses or increasing income"),
+    ("debt_to_income", "Focus on paying down high-interest debt to improve your debt-to-income ratio"),
+    ("emergency_fund", "Build your emergency fund to cover 3-6 months of expenses"),
+    ("investment_diversity", "Diversify your investment portfolio across different asset classes"),
+    ("budget_adherence", "Improve budget tracking and adherence to spending limits")
+)
+_ADVISOR_RECOMMENDATION = "Consider consulting with a financial advisor for personalized guidance"
+
+def _table_scores(values: np.ndarray, cutoffs: tuple, scores: tuple, side: str) -> np.ndarray:
+    """Vectorized form of the bisect score lookups; side matches bisect_right/bisect_left"""
+    return np.asarray(scores)[np.searchsorted(cutoffs, values, side=side)]
+
 class FinancialService:
     """Service for financial calculations and analysis"""
     
     def __init__(self):
         """Initialize financial service"""
         self.supported_currencies = ["USD", "EUR", "GBP", "JPY", "CAD", "AUD"]
+        
+        # Results of the pure calculations, keyed on their inputs (dashboards re-poll the same data)
+        self._health_score_cache = LRUCache(maxsize=1024)
+        self._retirement_cache = LRUCache(maxsize=1024)
     
     async def calculate_financial_health_score(
         self, 
@@ -26,55 +74,20 @@ class FinancialService:
     ) -> Dict[str, Any]:
         """Calculate overall financial health score"""
         try:
-            scores = {}
-            weights = {
-                "savings_rate": 0.25,
-                "debt_to_income": 0.20,
-                "emergency_fund": 0.20,
-                "investment_diversity": 0.15,
-                "budget_adherence": 0.20
-            }
-            
-            # Calculate individual scores
-            scores["savings_rate"] = self._calculate_savings_score(
-                financial_data.get("income", 0),
-                financial_data.get("expenses", 0)
-            )
-            
-            scores["debt_to_income"] = self._calculate_debt_score(
-                financial_data.get("debt", 0),
-                financial_data.get("income", 0)
-            )
-            
-            scores["emergency_fund"] = self._calculate_emergency_fund_score(
-                financial_data.get("emergency_fund", 0),
-                financial_data.get("monthly_expenses", 0)
-            )
-            
-            scores["investment_diversity"] = self._calculate_investment_diversity_score(
-                financial_data.get("investment_portfolio", {})
-            )
-            
-            scores["budget_adherence"] = self._calculate_budget_adherence_score(
-                financial_data.get("budget", {}),
-                financial_data.get("actual_spending", {})
-            )
-            
-            # Calculate weighted average
-            total_score = sum(
-                scores[metric] * weights[metric] 
-                for metric in weights.keys()
-            )
-            
-            # Determine grade
-            grade = self._get_financial_grade(total_score)
-            
+            key = self._health_score_key(financial_data)
+            health = self._health_score_cache.get(key) if key is not None else None
+            if health is None:
+                health = self._compute_health_score(financial_data)
+                if key is not None:
+                    self._health_score_cache[key] = health
+            
+            # Fresh containers per response; the cached struct is shared
             return {
-                "overall_score": round(total_score, 2),
-                "grade": grade,
-                "component_scores": scores,
-                "weights": weights,
-                "recommendations": self._generate_health_recommendations(scores, total_score),
+                "overall_score": round(health.overall_score, 2),
+                "grade": health.grade,
+                "component_scores": dict(health.component_scores),
+                "weights": dict(_HEALTH_WEIGHTS),
+                "recommendations": list(health.recommendations),
                 "calculated_at": datetime.utcnow().isoformat()
             }
             
@@ -82,25 +95,119 @@ class FinancialService:
             logger.error(f"Failed to calculate financial health score: {e}")
             return {"error": "Failed to calculate financial health score"}
     
+    def calculate_financial_health_score_batch(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Score many users at once, e.g. for cohort backfills
+        
+        Columns: income, expenses, debt, emergency_fund, monthly_expenses and optionally
+        asset_class_count and budget_variance (mean relative budget deviation). Missing
+        optional values score as no holdings and a neutral budget, as the per-user path does.
+        """
+        def column(name: str, default: float) -> np.ndarray:
+            if name not in data:
+                return np.full(len(data), default, dtype=np.float64)
+            return data[name].to_numpy(dtype=np.float64, na_value=default)
+        
+        income = column("income", 0.0)
+        monthly_expenses = column("monthly_expenses", 0.0)
+        asset_classes = column("asset_class_count", 0.0)
+        budget_variance = column("budget_variance", np.nan)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            savings_rate = (income - column("expenses", 0.0)) / income
+            debt_ratio = column("debt", 0.0) / income
+            months_covered = column("emergency_fund", 0.0) / monthly_expenses
+        
+        has_income = income > 0
+        scores = np.column_stack([
+            np.where(has_income, _table_scores(savings_rate, _SAVINGS_RATE_CUTOFFS, _SAVINGS_RATE_SCORES, "right"), 0),
+            np.where(has_income, _table_scores(debt_ratio, _DEBT_RATIO_CUTOFFS, _DEBT_RATIO_SCORES, "left"), 0),
+            np.where(
+                monthly_expenses > 0,
+                _table_scores(months_covered, _EMERGENCY_MONTHS_CUTOFFS, _EMERGENCY_MONTHS_SCORES, "right"),
+                0
+            ),
+            np.asarray(_ASSET_CLASS_SCORES)[
+                np.clip(asset_classes, 0, len(_ASSET_CLASS_SCORES) - 1).astype(np.intp)
+            ],
+            np.where(
+                np.isnan(budget_variance),
+                50,
+                _table_scores(budget_variance, _BUDGET_VARIANCE_CUTOFFS, _BUDGET_VARIANCE_SCORES, "left")
+            )
+        ])
+        
+        overall = scores @ np.fromiter(_HEALTH_WEIGHTS.values(), dtype=np.float64)
+        result = pd.DataFrame(scores, columns=list(_HEALTH_WEIGHTS), index=data.index)
+        result["overall_score"] = overall.round(2)
+        result["grade"] = _table_scores(overall, _GRADE_CUTOFFS, _GRADES, "right")
+        return result
+    
+    def _health_score_key(self, financial_data: Dict) -> Optional[tuple]:
+        """Hashable key over the inputs the health score reads, or None if they aren't hashable"""
+        portfolio = financial_data.get("investment_portfolio") or {}
+        try:
+            return (
+                financial_data.get("income", 0),
+                financial_data.get("expenses", 0),
+                financial_data.get("debt", 0),
+                financial_data.get("emergency_fund", 0),
+                financial_data.get("monthly_expenses", 0),
+                frozenset(h.get("asset_type", "unknown") for h in portfolio.get("holdings") or ()),
+                frozenset((financial_data.get("budget") or {}).items()),
+                frozenset((financial_data.get("actual_spending") or {}).items())
+            )
+        except (TypeError, AttributeError):
+            return None
+    
+    def _compute_health_score(self, financial_data: Dict) -> HealthScoreMsg:
+        """Score each component and grade the weighted total"""
+        scores = {}
+        
+        # Calculate individual scores
+        scores["savings_rate"] = self._calculate_savings_score(
+            financial_data.get("income", 0),
+            financial_data.get("expenses", 0)
+        )
+        
+        scores["debt_to_income"] = self._calculate_debt_score(
+            financial_data.get("debt", 0),
+            financial_data.get("income", 0)
+        )
+        
+        scores["emergency_fund"] = self._calculate_emergency_fund_score(
+            financial_data.get("emergency_fund", 0),
+            financial_data.get("monthly_expenses", 0)
+        )
+        
+        scores["investment_diversity"] = self._calculate_investment_diversity_score(
+            financial_data.get("investment_portfolio", {})
+        )
+        
+        scores["budget_adherence"] = self._calculate_budget_adherence_score(
+            financial_data.get("budget", {}),
+            financial_data.get("actual_spending", {})
+        )
+        
+        # Calculate weighted average
+        total_score = sum(
+            scores[metric] * weight
+            for metric, weight in _HEALTH_WEIGHTS.items()
+        )
+        
+        return HealthScoreMsg(
+            component_scores=scores,
+            overall_score=total_score,
+            grade=self._get_financial_grade(total_score),
+            recommendations=tuple(self._generate_health_recommendations(scores, total_score))
+        )
+    
     def _calculate_savings_score(self, income: float, expenses: float) -> float:
         """Calculate savings rate score (0-100)"""
         if income <= 0:
             return 0
         
         savings_rate = (income - expenses) / income
-        
-        if savings_rate >= 0.3:
-            return 100
-        elif savings_rate >= 0.2:
-            return 80
-        elif savings_rate >= 0.15:
-            return 60
-        elif savings_rate >= 0.1:
-            return 40
-        elif savings_rate >= 0.05:
-            return 20
-        else:
-            return 0
+        return _SAVINGS_RATE_SCORES[bisect.bisect_right(_SAVINGS_RATE_CUTOFFS, savings_rate)]
     
     def _calculate_debt_score(self, debt: float, income: float) -> float:
         """Calculate debt-to-income ratio score (0-100)"""
@@ -108,19 +215,7 @@ class FinancialService:
             return 0
         
         debt_ratio = debt / income
-        
-        if debt_ratio <= 0.28:
-            return 100
-        elif debt_ratio <= 0.36:
-            return 80
-        elif debt_ratio <= 0.43:
-            return 60
-        elif debt_ratio <= 0.50:
-            return 40
-        elif debt_ratio <= 0.60:
-            return 20
-        else:
-            return 0
+        return _DEBT_RATIO_SCORES[bisect.bisect_left(_DEBT_RATIO_CUTOFFS, debt_ratio)]
     
     def _calculate_emergency_fund_score(
         self, 
@@ -132,43 +227,19 @@ class FinancialService:
             return 0
         
         months_covered = emergency_fund / monthly_expenses
-        
-        if months_covered >= 6:
-            return 100
-        elif months_covered >= 4:
-            return 80
-        elif months_covered >= 3:
-            return 60
-        elif months_covered >= 2:
-            return 40
-        elif months_covered >= 1:
-            return 20
-        else:
-            return 0
+        return _EMERGENCY_MONTHS_SCORES[bisect.bisect_right(_EMERGENCY_MONTHS_CUTOFFS, months_covered)]
     
     def _calculate_investment_diversity_score(self, portfolio: Dict) -> float:
         """Calculate investment diversity score (0-100)"""
         if not portfolio or not portfolio.get("holdings"):
             return 0
         
-        holdings = portfolio["holdings"]
-        asset_classes = set()
-        
-        for holding in holdings:
-            asset_type = holding.get("asset_type", "unknown")
-            asset_classes.add(asset_type)
+        asset_classes = frozenset(
+            holding.get("asset_type", "unknown") for holding in portfolio["holdings"]
+        )
         
         # Score based on number of asset classes
-        if len(asset_classes) >= 5:
-            return 100
-        elif len(asset_classes) >= 4:
-            return 80
-        elif len(asset_classes) >= 3:
-            return 60
-        elif len(asset_classes) >= 2:
-            return 40
-        else:
-            return 20
+        return _ASSET_CLASS_SCORES[min(len(asset_classes), len(_ASSET_CLASS_SCORES) - 1)]
     
     def _calculate_budget_adherence_score(
         self, 
@@ -193,44 +264,11 @@ class FinancialService:
             return 50
         
         avg_variance = total_variance / categories
-        
-        if avg_variance <= 0.1:
-            return 100
-        elif avg_variance <= 0.2:
-            return 80
-        elif avg_variance <= 0.3:
-            return 60
-        elif avg_variance <= 0.5:
-            return 40
-        else:
-            return 20
+        return _BUDGET_VARIANCE_SCORES[bisect.bisect_left(_BUDGET_VARIANCE_CUTOFFS, avg_variance)]
     
     def _get_financial_grade(self, score: float) -> str:
         """Convert score to letter grade"""
-        if score >= 90:
-            return "A+"
-        elif score >= 85:
-            return "A"
-        elif score >= 80:
-            return "A-"
-        elif score >= 75:
-            return "B+"
-        elif score >= 70:
-            return "B"
-        elif score >= 65:
-            return "B-"
-        elif score >= 60:
-            return "C+"
-        elif score >= 55:
-            return "C"
-        elif score >= 50:
-            return "C-"
-        elif score >= 45:
-            return "D+"
-        elif score >= 40:
-            return "D"
-        else:
-            return "F"
+        return _GRADES[bisect.bisect_right(_GRADE_CUTOFFS, score)]
     
     def _generate_health_recommendations(
         self, 
@@ -238,25 +276,13 @@ class FinancialService:
         overall_score: float
     ) -> List[str]:
         """Generate personalized recommendations based on scores"""
-        recommendations = []
-        
-        if scores.get("savings_rate", 0) < 60:
-            recommendations.append("Increase your savings rate by reducing expenses or increasing income")
-        
-        if scores.get("debt_to_income", 0) < 60:
-            recommendations.append("Focus on paying down high-interest debt to improve your debt-to-income ratio")
-        
-        if scores.get("emergency_fund", 0) < 60:
-            recommendations.append("Build your emergency fund to cover 3-6 months of expenses")
-        
-        if scores.get("investment_diversity", 0) < 60:
-            recommendations.append("Diversify your investment portfolio across different asset classes")
-        
-        if scores.get("budget_adherence", 0) < 60:
-            recommendations.append("Improve budget tracking and adherence to spending limits")
+        recommendations = [
+            message for metric, message in _HEALTH_RECOMMENDATIONS
+            if scores.get(metric, 0) < 60
+        ]
         
         if overall_score < 70:
-            recommendations.append("Consider consulting with a financial advisor for personalized guidance")
+            recommendations.append(_ADVISOR_RECOMMENDATION)
         
         return recommendations
     
@@ -270,21 +296,34 @@ class FinancialService:
             if not transactions:
                 return {"error": "No transactions to analyze"}
             
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(transactions)
-            df['transaction_date'] = pd.to_datetime(df['transaction_date'])
-            df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-            
-            # Filter by timeframe
-            if timeframe == "monthly":
-                df['period'] = df['transaction_date'].dt.to_period('M')
-            elif timeframe == "weekly":
-                df['period'] = df['transaction_date'].dt.to_period('W')
+            # Aggregation runs on integer keys over typed columns
+            days, amounts, cat_codes, categories = self._transaction_columns(transactions)
+            
+            # Rows without a date or category fall out of the grouping, as with groupby
+            valid = ~np.isnat(days) & (cat_codes >= 0)
+            period_keys = self._period_keys(days[valid], timeframe)
+            
+            # Group by period and category: one int64 key per row, summed with bincount
+            n_categories = len(categories)
+            first_period = int(period_keys.min()) if period_keys.size else 0
+            keys = (period_keys - first_period) * n_categories + cat_codes[valid]
+            weights = np.nan_to_num(amounts[valid])
+            n_cells = (int(period_keys.max()) - first_period + 1) * n_categories if period_keys.size else 0
+            if n_categories <= _DENSE_GROUP_MAX_CATEGORIES and n_cells <= _DENSE_GROUP_MAX_CELLS:
+                # Few categories: the keys index a small dense grid directly, no sort needed
+                group_keys = np.flatnonzero(np.bincount(keys, minlength=n_cells))
+                sums = np.bincount(keys, weights=weights, minlength=n_cells)[group_keys]
             else:
-                df['period'] = df['transaction_date'].dt.to_period('M')
+                group_keys, group_idx = np.unique(keys, return_inverse=True)
+                sums = np.bincount(group_idx, weights=weights, minlength=len(group_keys))
+            group_periods, group_cats = np.divmod(group_keys, n_categories)
+            group_periods += first_period
             
-            # Group by period and category
-            spending_by_period = df.groupby(['period', 'category'])['amount'].sum().reset_index()
+            spending_by_period = pd.DataFrame({
+                "period": self._period_labels(group_periods, timeframe),
+                "category": categories.to_numpy()[group_cats],
+                "amount": sums
+            })
             
             # Calculate trends
             trends = self._calculate_spending_trends(spending_by_period)
@@ -298,7 +337,7 @@ class FinancialService:
             return {
                 "timeframe": timeframe,
                 "total_transactions": len(transactions),
-                "total_spent": float(df['amount'].sum()),
+                "total_spent": float(np.nansum(amounts)),
                 "spending_by_period": spending_by_period.to_dict('records'),
                 "trends": trends,
                 "anomalies": anomalies,
@@ -310,33 +349,87 @@ class FinancialService:
             logger.error(f"Failed to analyze spending patterns: {e}")
             return {"error": "Failed to analyze spending patterns"}
     
+    def _transaction_columns(
+        self,
+        transactions: List[Dict]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, pd.Index]:
+        """Convert transaction dicts once into date, amount and category-code arrays"""
+        raw_dates, raw_amounts, raw_categories = zip(*(
+            (t.get('transaction_date'), t.get('amount'), t.get('category')) for t in transactions
+        ))
+        
+        dates = pd.to_datetime(pd.Series(raw_dates))
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        days = dates.to_numpy(dtype='datetime64[D]')
+        
+        try:
+            amounts = np.asarray(raw_amounts, dtype=np.float64)
+        except (TypeError, ValueError):
+            # Only malformed values pay for pandas' per-element coercion
+            amounts = pd.to_numeric(pd.Series(raw_amounts), errors='coerce').to_numpy(dtype=np.float64)
+        
+        cat_codes, categories = pd.factorize(pd.Series(raw_categories), sort=True)
+        return days, amounts, cat_codes, categories
+    
+    def _period_keys(self, days: np.ndarray, timeframe: str) -> np.ndarray:
+        """Map datetime64[D] values to integer month or week numbers"""
+        if timeframe == "weekly":
+            # Monday-based weeks counted from the epoch, which fell on a Thursday
+            return (days.astype(np.int64) + 3) // 7
+        return days.astype('datetime64[M]').astype(np.int64)
+    
+    def _period_labels(self, keys: np.ndarray, timeframe: str) -> np.ndarray:
+        """Render period numbers the way pandas prints the matching Period"""
+        if timeframe == "weekly":
+            starts = (keys * 7 - 3).astype('datetime64[D]')
+            return np.char.add(
+                np.char.add(np.datetime_as_string(starts), "/"),
+                np.datetime_as_string(starts + 6)
+            )
+        return np.datetime_as_string(keys.astype('datetime64[M]'))
+    
     def _calculate_spending_trends(self, spending_data: pd.DataFrame) -> Dict[str, Any]:
         """Calculate spending trends over time"""
         try:
             trends = {}
             
+            # Rows arrive ordered by (period, category), so factorize keeps both in order
+            period_codes, periods = pd.factorize(spending_data['period'])
+            cat_codes, categories = pd.factorize(spending_data['category'])
+            amounts = spending_data['amount'].to_numpy(dtype=np.float64)
+            
             # Overall trend
-            total_by_period = spending_data.groupby('period')['amount'].sum()
+            total_by_period = np.bincount(period_codes, weights=amounts, minlength=len(periods))
             if len(total_by_period) > 1:
-                trend_slope = np.polyfit(range(len(total_by_period)), total_by_period.values, 1)[0]
+                trend_slope = self._grouped_slopes(
+                    np.arange(len(total_by_period), dtype=np.float64),
+                    total_by_period,
+                    np.zeros(len(total_by_period), dtype=np.intp),
+                    1
+                )[0]
                 trends["overall"] = {
                     "direction": "increasing" if trend_slope > 0 else "decreasing",
                     "slope": float(trend_slope),
                     "change_percent": float((trend_slope / total_by_period.mean()) * 100)
                 }
             
-            # Category trends
-            category_trends = {}
-            for category in spending_data['category'].unique():
-                category_data = spending_data[spending_data['category'] == category]
-                if len(category_data) > 1:
-                    category_totals = category_data.groupby('period')['amount'].sum()
-                    if len(category_totals) > 1:
-                        cat_slope = np.polyfit(range(len(category_totals)), category_totals.values, 1)[0]
-                        category_trends[category] = {
-                            "direction": "increasing" if cat_slope > 0 else "decreasing",
-                            "slope": float(cat_slope)
-                        }
+            # Category trends: x is each row's position within its own category's series
+            n_categories = len(categories)
+            counts = np.bincount(cat_codes, minlength=n_categories)
+            order = np.argsort(cat_codes, kind='stable')
+            positions = np.empty(len(cat_codes), dtype=np.float64)
+            positions[order] = np.arange(len(cat_codes)) - np.repeat(np.cumsum(counts) - counts, counts)
+            slopes = self._grouped_slopes(positions, amounts, cat_codes, n_categories)
+            
+            category_trends = {
+                category: {
+                    "direction": "increasing" if cat_slope > 0 else "decreasing",
+                    "slope": float(cat_slope)
+                }
+                for category, count, cat_slope in zip(categories, counts, slopes)
+                if count > 1
+            }
             
             trends["categories"] = category_trends
             return trends
@@ -345,29 +438,45 @@ class FinancialService:
             logger.error(f"Failed to calculate spending trends: {e}")
             return {}
     
+    def _grouped_slopes(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        groups: np.ndarray,
+        n_groups: int
+    ) -> np.ndarray:
+        """Least-squares slope of y on x for every group at once (NaN below two points)"""
+        counts = np.bincount(groups, minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Centre on group means before the cross products to avoid cancellation
+            dx = x - (np.bincount(groups, weights=x, minlength=n_groups) / counts)[groups]
+            dy = y - (np.bincount(groups, weights=y, minlength=n_groups) / counts)[groups]
+            slopes = (
+                np.bincount(groups, weights=dx * dy, minlength=n_groups)
+                / np.bincount(groups, weights=dx * dx, minlength=n_groups)
+            )
+        slopes[counts < 2] = np.nan
+        return slopes
+    
     def _detect_spending_anomalies(self, spending_data: pd.DataFrame) -> List[Dict[str, Any]]:
         """Detect unusual spending patterns"""
         try:
-            anomalies = []
-            
-            # Calculate z-scores for amount
-            amounts = spending_data['amount'].values
-            mean_amount = np.mean(amounts)
-            std_amount = np.std(amounts)
-            
-            if std_amount > 0:
-                z_scores = np.abs((amounts - mean_amount) / std_amount)
-                anomaly_indices = np.where(z_scores > 2)[0]  # 2 standard deviations
-                
-                for idx in anomaly_indices:
-                    row = spending_data.iloc[idx]
-                    anomalies.append({
-                        "period": str(row['period']),
-                        "category": row['category'],
-                        "amount": float(row['amount']),
-                        "z_score": float(z_scores[idx]),
-                        "description": f"Unusually high spending in {row['category']} during {row['period']}"
-                    })
+            amounts = spending_data['amount'].to_numpy(dtype=np.float64)
+            indices, z_scores = zscore_outliers(amounts, 2.0)  # 2 standard deviations
+            
+            # Only the flagged rows are materialised
+            periods = spending_data['period'].to_numpy()[indices]
+            categories = spending_data['category'].to_numpy()[indices]
+            anomalies = [
+                {
+                    "period": str(period),
+                    "category": category,
+                    "amount": float(amounts[idx]),
+                    "z_score": float(z_score),
+                    "description": f"Unusually high spending in {category} during {period}"
+                }
+                for idx, period, category, z_score in zip(indices, periods, categories, z_scores)
+            ]
             
             return anomalies
             
@@ -415,14 +524,19 @@ class FinancialService:
     ) -> Dict[str, Any]:
         """Calculate retirement savings needs"""
         try:
+            key = (current_age, retirement_age, current_savings, desired_income, inflation_rate, investment_return)
+            cached = self._retirement_cache.get(key)
+            if cached is not None:
+                return {**cached, "assumptions": dict(cached["assumptions"])}
+            
             years_to_retirement = retirement_age - current_age
             years_in_retirement = 30  # Assume 30 years in retirement
             
             # Calculate future value of current savings
-            future_savings = current_savings * (1 + investment_return) ** years_to_retirement
+            future_savings = current_savings * math.exp(years_to_retirement * math.log1p(investment_return))
             
             # Calculate inflation-adjusted desired income
-            inflation_adjusted_income = desired_income * (1 + inflation_rate) ** years_to_retirement
+            inflation_adjusted_income = desired_income * math.exp(years_to_retirement * math.log1p(inflation_rate))
             
             # Calculate total retirement needs (simplified)
             total_needed = inflation_adjusted_income * years_in_retirement
@@ -430,13 +544,18 @@ class FinancialService:
             # Calculate additional savings needed
             additional_needed = total_needed - future_savings
             
-            # Calculate monthly savings required
-            if additional_needed > 0:
-                monthly_savings = additional_needed / ((1 + investment_return) ** years_to_retirement - 1) * (investment_return / 12)
-            else:
+            # Monthly deposit whose future value at retirement covers the gap:
+            # P = FV * i / ((1 + i) ** n - 1), with expm1 keeping small i accurate
+            monthly_return = investment_return / 12
+            num_months = years_to_retirement * 12
+            if additional_needed <= 0:
                 monthly_savings = 0
+            elif monthly_return == 0:
+                monthly_savings = additional_needed / num_months
+            else:
+                monthly_savings = additional_needed * monthly_return / math.expm1(num_months * math.log1p(monthly_return))
             
-            return {
+            result = {
                 "current_age": current_age,
                 "retirement_age": retirement_age,
                 "years_to_retirement": years_to_retirement,
@@ -453,6 +572,8 @@ class FinancialService:
                     "years_in_retirement": years_in_retirement
                 }
             }
+            self._retirement_cache[key] = result
+            return {**result, "assumptions": dict(result["assumptions"])}
             
         except Exception as e:
             logger.error(f"Failed to calculate retirement needs: {e}")
@@ -478,9 +599,10 @@ class FinancialService:
             else:
                 num_payments = years * 12
             
-            # Calculate payment amount
+            # Calculate payment amount; growth - 1 via expm1 so tiny rates don't cancel
             if monthly_rate > 0:
-                payment = principal * (monthly_rate * (1 + monthly_rate) ** num_payments) / ((1 + monthly_rate) ** num_payments - 1)
+                growth_minus_one = math.expm1(num_payments * math.log1p(monthly_rate))
+                payment = principal * monthly_rate * (1 + growth_minus_one) / growth_minus_one
             else:
                 payment = principal / num_payments
             
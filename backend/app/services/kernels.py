@@ -0,0 +1,181 @@
+"""
+Numeric kernels for the financial services
+
+Compiled with numba when it is installed; otherwise equivalent NumPy
+implementations are used. Kernels carry explicit signatures so numba compiles
+them when this module is imported (or loads them from its on-disk cache)
+rather than on the first request that calls them.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _zscore_any_outlier_np(amounts: np.ndarray, thresh: float) -> bool:
+    if amounts.size == 0:
+        return False
+    std = amounts.std()
+    if std == 0:
+        return False
+    return bool((np.abs(amounts - amounts.mean()) > thresh * std).any())
+
+def _zscore_outliers_np(amounts: np.ndarray, thresh: float):
+    if amounts.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    std = amounts.std()
+    if std == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    z_scores = np.abs(amounts - amounts.mean()) / std
+    indices = np.flatnonzero(z_scores > thresh)
+    return indices, z_scores[indices]
+
+def _mean_std_np(values: np.ndarray):
+    if values.size == 0:
+        return np.nan, np.nan
+    return float(values.mean()), float(values.std())
+
+def _worst_drawdown_np(returns: np.ndarray) -> float:
+    if returns.size == 0:
+        return 0.0
+    cumulative = np.cumprod(1.0 + returns)
+    running_max = np.maximum.accumulate(cumulative)
+    cumulative -= running_max
+    cumulative /= running_max
+    return float(cumulative.min())
+
+if njit is not None:
+    @njit("boolean(float64[:], float64)", cache=True)
+    def zscore_any_outlier(amounts, thresh):
+        """Return True if any amount lies more than thresh population std devs from the mean"""
+        n = amounts.shape[0]
+        
+        # Welford's running mean/variance in one pass
+        mean = 0.0
+        m2 = 0.0
+        for i in range(n):
+            delta = amounts[i] - mean
+            mean += delta / (i + 1)
+            m2 += delta * (amounts[i] - mean)
+        if n == 0 or m2 <= 0.0:
+            return False
+        
+        # Stop at the first outlier
+        limit = thresh * np.sqrt(m2 / n)
+        for i in range(n):
+            if abs(amounts[i] - mean) > limit:
+                return True
+        return False
+    
+    @njit("Tuple((int64[:], float64[:]))(float64[:], float64)", cache=True)
+    def zscore_outliers(amounts, thresh):
+        """Return indices and absolute z-scores of amounts more than thresh population std devs from the mean"""
+        n = amounts.shape[0]
+        
+        # Welford's running mean/variance in one pass
+        mean = 0.0
+        m2 = 0.0
+        for i in range(n):
+            delta = amounts[i] - mean
+            mean += delta / (i + 1)
+            m2 += delta * (amounts[i] - mean)
+        if n == 0 or m2 <= 0.0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        std = np.sqrt(m2 / n)
+        
+        indices = np.empty(n, dtype=np.int64)
+        z_scores = np.empty(n, dtype=np.float64)
+        count = 0
+        for i in range(n):
+            z = abs(amounts[i] - mean) / std
+            if z > thresh:
+                indices[count] = i
+                z_scores[count] = z
+                count += 1
+        return indices[:count], z_scores[:count]
+    
+    @njit("UniTuple(float64, 2)(float64[:])", cache=True)
+    def mean_std(values):
+        """Return the mean and population std dev of values in one pass (Welford)"""
+        n = values.shape[0]
+        if n == 0:
+            return np.nan, np.nan
+        mean = 0.0
+        m2 = 0.0
+        for i in range(n):
+            delta = values[i] - mean
+            mean += delta / (i + 1)
+            m2 += delta * (values[i] - mean)
+        return mean, np.sqrt(m2 / n)
+    
+    @njit("float64(float64[:])", cache=True, fastmath=True)
+    def worst_drawdown(returns):
+        """Return the most negative peak-to-trough drawdown of compounded returns"""
+        n = returns.shape[0]
+        if n == 0:
+            return 0.0
+        
+        # Running value, peak and drawdown as scalars; no temporary arrays
+        cumulative = 1.0 + returns[0]
+        peak = cumulative
+        worst = 0.0
+        for i in range(1, n):
+            cumulative *= 1.0 + returns[i]
+            if cumulative > peak:
+                peak = cumulative
+            drawdown = (cumulative - peak) / peak
+            if drawdown < worst:
+                worst = drawdown
+        return worst
+else:
+    zscore_any_outlier = _zscore_any_outlier_np
+    zscore_outliers = _zscore_outliers_np
+    mean_std = _mean_std_np
+    worst_drawdown = _worst_drawdown_np
+
+def _ema_last_loop(values, span):
+    # EMA seeded with the SMA of the first span values, as pandas-ta does
+    n = values.shape[0]
+    if n < span:
+        return np.nan
+    ema = 0.0
+    for i in range(span):
+        ema += values[i]
+    ema /= span
+    alpha = 2.0 / (span + 1.0)
+    for i in range(span, n):
+        ema = alpha * values[i] + (1.0 - alpha) * ema
+    return ema
+
+def _rsi_last_loop(values, length):
+    # Wilder's RSI: SMA-seeded average gain/loss, then (avg * (length - 1) + x) / length
+    n = values.shape[0]
+    if n <= length:
+        return np.nan
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, length + 1):
+        delta = values[i] - values[i - 1]
+        if delta > 0:
+            gain += delta
+        else:
+            loss -= delta
+    gain /= length
+    loss /= length
+    for i in range(length + 1, n):
+        delta = values[i] - values[i - 1]
+        gain = (gain * (length - 1) + (delta if delta > 0 else 0.0)) / length
+        loss = (loss * (length - 1) + (-delta if delta < 0 else 0.0)) / length
+    if loss == 0.0:
+        return 50.0 if gain == 0.0 else 100.0
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+# Recurrences have no vectorised NumPy form; without numba the short loops run as-is
+if njit is not None:
+    ema_last = njit("float64(float64[:], int64)", cache=True)(_ema_last_loop)
+    rsi_last = njit("float64(float64[:], int64)", cache=True)(_rsi_last_loop)
+else:
+    ema_last = _ema_last_loop
+    rsi_last = _rsi_last_loop
@@ -5,14 +5,16 @@ Handles chatbot interactions, NLP, financial guidance, and modern AI capabilitie
 
 import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+from types import MappingProxyType
+from collections import defaultdict
+from typing import Dict, List, Mapping, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import asyncio
-import aiohttp
+from cachetools import TTLCache
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
 import ibm_watson
 from ibm_watson import AssistantV2
 from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
@@ -20,10 +22,139 @@ from ibm_watson import NaturalLanguageUnderstandingV1
 from ibm_watson.natural_language_understanding_v1 import Features, SentimentOptions, KeywordsOptions
 
 from app.core.config import settings
+from app.core.keywords import KeywordMatcher
 from app.core.security import hash_query, sanitize_input
+from app.services.kernels import mean_std
 
 logger = logging.getLogger(__name__)
 
+# Prediction types with a vectorized batch implementation
+BATCHED_PREDICTION_TYPES = {"savings"}
+
+# Keyword matchers, built once so each check is a single scan of the message.
+# Category order is match priority.
+_MOOD_MATCHER = KeywordMatcher({
+    "financial_stress": ('debt', 'broke', 'struggling', 'worried', 'anxious', 'stress', 'overwhelmed'),
+    "financial_confidence": ('confident', 'secure', 'stable', 'growing', 'investing', 'saving'),
+    "financial_planning": ('plan', 'goal', 'future', 'retirement', 'budget', 'strategy')
+})
+
+_FALLBACK_MATCHER = KeywordMatcher({
+    "savings": ('save', 'saving', 'savings'),
+    "investment": ('invest', 'investment', 'portfolio'),
+    "taxes": ('tax', 'taxes', 'deduction'),
+    "budgeting": ('budget', 'budgeting', 'spend')
+})
+_FALLBACK_RESPONSES = {
+    "savings": "To improve your savings, try the 50/30/20 rule: 50% for needs, 30% for wants, and 20% for savings. Start by setting up automatic transfers to a high-yield savings account.",
+    "investment": "For investments, consider starting with index funds for diversification. Your allocation should match your risk tolerance and time horizon. Remember to regularly rebalance your portfolio.",
+    "taxes": "Common tax deductions include retirement contributions, mortgage interest, and charitable donations. Consider consulting a tax professional for personalized advice.",
+    "budgeting": "Create a budget by tracking all income and expenses. Use apps or spreadsheets to monitor your spending. Set realistic goals and review your budget monthly."
+}
+_DEFAULT_FALLBACK_RESPONSE = "I'm here to help with your financial questions! You can ask me about saving, investing, taxes, budgeting, or any other financial topics. What would you like to know?"
+
+# Financial categories and their keywords
+_INTENT_MATCHER = KeywordMatcher({
+    "savings": ("save", "saving", "savings", "emergency fund", "nest egg"),
+    "investment": ("invest", "investment", "portfolio", "stocks", "bonds", "etf"),
+    "budgeting": ("budget", "budgeting", "spend", "expense", "track"),
+    "debt": ("debt", "credit", "loan", "pay off", "consolidate"),
+    "retirement": ("retirement", "401k", "ira", "pension", "social security"),
+    "taxes": ("tax", "taxes", "deduction", "refund", "filing"),
+    "insurance": ("insurance", "coverage", "policy", "protect"),
+    "real_estate": ("house", "home", "mortgage", "down payment", "real estate")
+})
+
+_QUESTION_MATCHER = KeywordMatcher({
+    "financial": (
+        "money", "finance", "invest", "save", "budget", "debt", "credit",
+        "loan", "retirement", "tax", "insurance", "mortgage", "stock",
+        "bond", "portfolio", "wealth", "income", "expense"
+    ),
+    "market": (
+        "market", "stock market", "economy", "recession", "inflation",
+        "interest rate", "fed", "trading", "bull market", "bear market"
+    )
+})
+
+# One "now" per public call, shared by every response built beneath it
+_REQUEST_TIME: ContextVar[Optional[str]] = ContextVar("watson_request_time", default=None)
+
+def _now_iso() -> str:
+    """Timestamp pinned for the current call, or the current time outside one"""
+    return _REQUEST_TIME.get() or datetime.utcnow().isoformat()
+
+def _request_scoped(func):
+    """Pin one timestamp for the duration of an entry point; nested entry points reuse it"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _REQUEST_TIME.get() is not None:
+            return await func(*args, **kwargs)
+        token = _REQUEST_TIME.set(datetime.utcnow().isoformat())
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _REQUEST_TIME.reset(token)
+    return wrapper
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+# Comprehensive financial knowledge base; static, so one read-only copy is shared by all instances
+_FINANCIAL_KB: Mapping[str, Any] = _freeze({
+    "investment_strategies": {
+        "conservative": {
+            "allocation": {"bonds": 70, "stocks": 20, "cash": 10},
+            "recommendations": ["Government bonds", "Blue-chip dividend stocks", "High-yield savings"],
+            "risk_level": "Low",
+            "expected_return": "3-5% annually"
+        },
+        "moderate": {
+            "allocation": {"stocks": 60, "bonds": 30, "cash": 10},
+            "recommendations": ["Index funds", "Corporate bonds", "REITs"],
+            "risk_level": "Medium",
+            "expected_return": "6-8% annually"
+        },
+        "aggressive": {
+            "allocation": {"stocks": 80, "bonds": 15, "cash": 5},
+            "recommendations": ["Growth stocks", "International ETFs", "Alternative investments"],
+            "risk_level": "High",
+            "expected_return": "8-12% annually"
+        }
+    },
+    "savings_goals": {
+        "emergency_fund": {"target": "3-6 months expenses", "priority": "High"},
+        "retirement": {"target": "25x annual expenses", "priority": "High"},
+        "down_payment": {"target": "20% of home value", "priority": "Medium"},
+        "vacation": {"target": "Flexible", "priority": "Low"}
+    },
+    "debt_strategies": {
+        "avalanche": "Pay highest interest rate first",
+        "snowball": "Pay smallest balance first",
+        "consolidation": "Combine multiple debts into one",
+        "refinancing": "Lower interest rates when possible"
+    }
+})
+
+@lru_cache(maxsize=4096)
+def _classify_financial_text(text: str, sentiment: str) -> str:
+    """Classify financial sentiment from keywords; memoized since chat messages repeat"""
+    # Stress, then confidence, then planning indicators
+    mood = _MOOD_MATCHER.best_category(text)
+    if mood is not None:
+        return mood
+    
+    # Neutral financial discussion
+    if sentiment == "neutral":
+        return "financial_neutral"
+    
+    return "general_financial"
+
 class WatsonService:
     """Enhanced IBM Watson service with modern AI capabilities"""
     
@@ -46,17 +177,11 @@ class WatsonService:
             )
             self.nlu.set_service_url(settings.WATSON_URL)
             
-            # Initialize ML models for financial predictions
-            self.spending_predictor = RandomForestRegressor(n_estimators=100, random_state=42)
-            self.risk_assessor = RandomForestRegressor(n_estimators=50, random_state=42)
-            self.scaler = StandardScaler()
-            
-            # Market data cache
-            self.market_cache = {}
-            self.cache_expiry = {}
+            # Market data cache; entries expire on access, so no separate expiry map
+            self.market_cache: TTLCache = TTLCache(maxsize=256, ttl=settings.MARKET_INFO_TTL)
             
             # Financial knowledge base
-            self.financial_kb = self._initialize_financial_knowledge_base()
+            self.financial_kb = _FINANCIAL_KB
             
             logger.info("Enhanced Watson services initialized successfully")
             
@@ -65,52 +190,17 @@ class WatsonService:
             self.assistant = None
             self.nlu = None
     
-    def _initialize_financial_knowledge_base(self) -> Dict[str, Any]:
-        """Initialize comprehensive financial knowledge base"""
-        return {
-            "investment_strategies": {
-                "conservative": {
-                    "allocation": {"bonds": 70, "stocks": 20, "cash": 10},
-                    "recommendations": ["Government bonds", "Blue-chip dividend stocks", "High-yield savings"],
-                    "risk_level": "Low",
-                    "expected_return": "3-5% annually"
-                },
-                "moderate": {
-                    "allocation": {"stocks": 60, "bonds": 30, "cash": 10},
-                    "recommendations": ["Index funds", "Corporate bonds", "REITs"],
-                    "risk_level": "Medium",
-                    "expected_return": "6-8% annually"
-                },
-                "aggressive": {
-                    "allocation": {"stocks": 80, "bonds": 15, "cash": 5},
-                    "recommendations": ["Growth stocks", "International ETFs", "Alternative investments"],
-                    "risk_level": "High",
-                    "expected_return": "8-12% annually"
-                }
-            },
-            "savings_goals": {
-                "emergency_fund": {"target": "3-6 months expenses", "priority": "High"},
-                "retirement": {"target": "25x annual expenses", "priority": "High"},
-                "down_payment": {"target": "20% of home value", "priority": "Medium"},
-                "vacation": {"target": "Flexible", "priority": "Low"}
-            },
-            "debt_strategies": {
-                "avalanche": "Pay highest interest rate first",
-                "snowball": "Pay smallest balance first",
-                "consolidation": "Combine multiple debts into one",
-                "refinancing": "Lower interest rates when possible"
-            }
-        }
-    
     async def create_session(self, user_id: str) -> Optional[str]:
         """Create a new chat session"""
         try:
             if not self.assistant:
                 return None
                 
-            response = self.assistant.create_session(
+            # The SDK is synchronous; keep its round trip off the event loop
+            response = (await asyncio.to_thread(
+                self.assistant.create_session,
                 assistant_id=self.assistant_id
-            ).get_result()
+            )).get_result()
             
             session_id = response['session_id']
             logger.info(f"Created Watson session: {session_id}")
@@ -120,6 +210,7 @@ class WatsonService:
             logger.error(f"Failed to create Watson session: {e}")
             return None
     
+    @_request_scoped
     async def send_message(
         self, 
         session_id: str, 
@@ -137,8 +228,11 @@ class WatsonService:
             # Prepare context
             context = self._prepare_context(user_context)
             
-            # Send message to Watson
-            response = self.assistant.message(
+            # Send message to Watson. Replies depend on the session's dialog
+            # state, so they are never cached; the synchronous SDK round trip
+            # just runs off the event loop.
+            response = (await asyncio.to_thread(
+                self.assistant.message,
                 assistant_id=self.assistant_id,
                 session_id=session_id,
                 input={
@@ -146,7 +240,7 @@ class WatsonService:
                     'text': sanitized_message
                 },
                 context=context
-            ).get_result()
+            )).get_result()
             
             # Process response and enhance with AI insights
             base_response = self._process_watson_response(response, message)
@@ -166,13 +260,15 @@ class WatsonService:
             if not self.nlu:
                 return {"sentiment": "neutral", "score": 0.0}
             
-            response = self.nlu.analyze(
+            # The SDK is synchronous; keep its round trip off the event loop
+            response = (await asyncio.to_thread(
+                self.nlu.analyze,
                 text=text,
                 features=Features(
                     sentiment=SentimentOptions(),
                     keywords=KeywordsOptions()
                 )
-            ).get_result()
+            )).get_result()
             
             sentiment = response.get('sentiment', {})
             
@@ -197,30 +293,14 @@ class WatsonService:
             logger.error(f"Failed to analyze sentiment: {e}")
             return {"sentiment": "neutral", "score": 0.0}
     
+    async def analyze_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze several texts with their NLU round trips in flight together"""
+        return list(await asyncio.gather(*[self.analyze_sentiment(text) for text in texts]))
+    
     def _classify_financial_sentiment(self, text: str, sentiment: str, score: float) -> str:
         """Classify financial sentiment based on context and keywords"""
-        text_lower = text.lower()
-        
-        # Financial stress indicators
-        stress_keywords = ['debt', 'broke', 'struggling', 'worried', 'anxious', 'stress', 'overwhelmed']
-        if any(keyword in text_lower for keyword in stress_keywords):
-            return "financial_stress"
-        
-        # Financial confidence indicators
-        confidence_keywords = ['confident', 'secure', 'stable', 'growing', 'investing', 'saving']
-        if any(keyword in text_lower for keyword in confidence_keywords):
-            return "financial_confidence"
-        
-        # Financial planning indicators
-        planning_keywords = ['plan', 'goal', 'future', 'retirement', 'budget', 'strategy']
-        if any(keyword in text_lower for keyword in planning_keywords):
-            return "financial_planning"
-        
-        # Neutral financial discussion
-        if sentiment == "neutral":
-            return "financial_neutral"
-        
-        return "general_financial"
+        # The score never affects the label, so cache on text and label only
+        return _classify_financial_text(text, sentiment)
     
     async def get_financial_insights(
         self, 
@@ -233,30 +313,38 @@ class WatsonService:
             
             # Analyze spending patterns
             if financial_data.get('transactions'):
-                spending_insight = await self._analyze_spending_patterns(
-                    financial_data['transactions']
-                )
-                insights.append(spending_insight)
+                try:
+                    insights.append(await self._analyze_spending_patterns(
+                        financial_data['transactions']
+                    ))
+                except Exception as e:
+                    logger.error(f"Spending insight analysis failed: {e}")
             
             # Analyze savings opportunities
             if financial_data.get('income') and financial_data.get('expenses'):
-                savings_insight = await self._analyze_savings_opportunities(
-                    financial_data['income'],
-                    financial_data['expenses']
-                )
-                insights.append(savings_insight)
+                try:
+                    insights.append(await self._analyze_savings_opportunities(
+                        financial_data['income'],
+                        financial_data['expenses']
+                    ))
+                except Exception as e:
+                    logger.error(f"Savings insight analysis failed: {e}")
             
             # Generate investment advice
             if user_profile.get('risk_tolerance'):
-                investment_insight = await self._generate_investment_advice(
-                    user_profile['risk_tolerance'],
-                    financial_data.get('investment_portfolio', {})
-                )
-                insights.append(investment_insight)
+                try:
+                    insights.append(await self._generate_investment_advice(
+                        user_profile['risk_tolerance'],
+                        financial_data.get('investment_portfolio', {})
+                    ))
+                except Exception as e:
+                    logger.error(f"Investment insight analysis failed: {e}")
             
             # Tax optimization tips
-            tax_insight = await self._generate_tax_tips(user_profile, financial_data)
-            insights.append(tax_insight)
+            try:
+                insights.append(await self._generate_tax_tips(user_profile, financial_data))
+            except Exception as e:
+                logger.error(f"Tax insight analysis failed: {e}")
             
             return insights
             
@@ -268,24 +356,21 @@ class WatsonService:
         """Analyze spending patterns and provide insights"""
         try:
             # Group transactions by category
-            categories = {}
-            total_spent = 0
-            
-            for transaction in transactions:
-                category = transaction.get('category', 'Other')
-                amount = abs(transaction.get('amount', 0))
-                
-                if category not in categories:
-                    categories[category] = 0
-                categories[category] += amount
-                total_spent += amount
-            
-            # Find top spending categories
-            top_categories = sorted(
-                categories.items(), 
-                key=lambda x: x[1], 
-                reverse=True
-            )[:3]
+            amounts = np.abs(np.fromiter(
+                (t.get('amount', 0) for t in transactions),
+                dtype=np.float64,
+                count=len(transactions)
+            ))
+            categories = pd.Series(amounts).groupby(
+                [t.get('category', 'Other') for t in transactions], sort=False, dropna=False
+            ).sum()
+            total_spent = float(amounts.sum())
+            
+            # Find top spending categories (first-seen order breaks ties, as the stable sort did)
+            top_categories = [
+                (category, float(amount))
+                for category, amount in categories.nlargest(3).items()
+            ]
             
             # Generate insights
             insights = []
@@ -462,7 +547,7 @@ class WatsonService:
                     "intents": response.get('output', {}).get('intents', []),
                     "entities": response.get('output', {}).get('entities', []),
                     "context": response.get('context', {}),
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": _now_iso()
                 }
             else:
                 return self._fallback_response(original_message)
@@ -474,18 +559,8 @@ class WatsonService:
     def _fallback_response(self, message: str) -> Dict[str, Any]:
         """Fallback response when Watson is unavailable"""
         # Simple keyword-based responses for common financial questions
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ['save', 'saving', 'savings']):
-            response = "To improve your savings, try the 50/30/20 rule: 50% for needs, 30% for wants, and 20% for savings. Start by setting up automatic transfers to a high-yield savings account."
-        elif any(word in message_lower for word in ['invest', 'investment', 'portfolio']):
-            response = "For investments, consider starting with index funds for diversification. Your allocation should match your risk tolerance and time horizon. Remember to regularly rebalance your portfolio."
-        elif any(word in message_lower for word in ['tax', 'taxes', 'deduction']):
-            response = "Common tax deductions include retirement contributions, mortgage interest, and charitable donations. Consider consulting a tax professional for personalized advice."
-        elif any(word in message_lower for word in ['budget', 'budgeting', 'spend']):
-            response = "Create a budget by tracking all income and expenses. Use apps or spreadsheets to monitor your spending. Set realistic goals and review your budget monthly."
-        else:
-            response = "I'm here to help with your financial questions! You can ask me about saving, investing, taxes, budgeting, or any other financial topics. What would you like to know?"
+        category = _FALLBACK_MATCHER.best_category(message)
+        response = _FALLBACK_RESPONSES[category] if category is not None else _DEFAULT_FALLBACK_RESPONSE
         
         return {
             "message": response,
@@ -494,7 +569,7 @@ class WatsonService:
             "intents": [],
             "entities": [],
             "context": {},
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _now_iso(),
             "fallback": True
         }
     
@@ -515,7 +590,8 @@ class WatsonService:
             if not self.assistant:
                 return False
                 
-            self.assistant.delete_session(
+            await asyncio.to_thread(
+                self.assistant.delete_session,
                 assistant_id=self.assistant_id,
                 session_id=session_id
             )
@@ -527,6 +603,7 @@ class WatsonService:
             logger.error(f"Failed to close Watson session: {e}")
             return False
     
+    @_request_scoped
     async def predict_financial_outcomes(
         self, 
         user_data: Dict, 
@@ -547,6 +624,34 @@ class WatsonService:
             logger.error(f"Financial prediction failed: {e}")
             return {"error": f"Prediction failed: {str(e)}"}
     
+    @_request_scoped
+    async def predict_financial_outcomes_batch(
+        self,
+        requests: List[Tuple[Dict, str]]
+    ) -> List[Dict[str, Any]]:
+        """Predict outcomes for a batch of (user_data, prediction_type) requests"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        
+        # Savings projections share one shape, so compute them together
+        savings_indices = [i for i, (_, prediction_type) in enumerate(requests) if prediction_type == "savings"]
+        if savings_indices:
+            savings_results = await self._predict_savings_growth_batch(
+                [requests[i][0] for i in savings_indices]
+            )
+            for i, result in zip(savings_indices, savings_results):
+                results[i] = result
+        
+        # Everything else falls back to the per-request path
+        remaining = [i for i, result in enumerate(results) if result is None]
+        if remaining:
+            remaining_results = await asyncio.gather(*[
+                self.predict_financial_outcomes(*requests[i]) for i in remaining
+            ])
+            for i, result in zip(remaining, remaining_results):
+                results[i] = result
+        
+        return results
+    
     async def _predict_spending_patterns(self, user_data: Dict) -> Dict[str, Any]:
         """Predict future spending patterns using statistical analysis"""
         try:
@@ -554,45 +659,38 @@ class WatsonService:
             if len(transactions) < 10:
                 return {"error": "Insufficient transaction data for prediction"}
             
-            # Extract spending data
-            spending_data = []
-            for transaction in transactions:
-                if transaction.get('amount', 0) < 0:  # Negative amounts are expenses
-                    spending_data.append({
-                        'amount': abs(transaction.get('amount', 0)),
-                        'category': transaction.get('category', 'Other'),
-                        'date': transaction.get('date', datetime.now())
-                    })
-            
-            if not spending_data:
+            # Extract spending data: negative amounts are expenses
+            signed_amounts = np.fromiter(
+                (t.get('amount', 0) for t in transactions),
+                dtype=np.float64,
+                count=len(transactions)
+            )
+            is_expense = signed_amounts < 0
+            if not is_expense.any():
                 return {"error": "No spending data found"}
+            amounts = -signed_amounts[is_expense]
             
-            # Calculate spending statistics
-            amounts = [item['amount'] for item in spending_data]
-            mean_spending = np.mean(amounts)
-            std_spending = np.std(amounts)
+            # Calculate spending statistics (population std, as np.std gave) in one pass
+            mean_spending, std_spending = mean_std(amounts)
             
             # Predict next month's spending
             predicted_spending = mean_spending * 1.02  # 2% monthly growth assumption
             
             # Calculate confidence intervals
-            confidence_95 = 1.96 * std_spending / np.sqrt(len(amounts))
-            
-            # Category-based predictions
-            category_spending = {}
-            for item in spending_data:
-                category = item['category']
-                if category not in category_spending:
-                    category_spending[category] = []
-                category_spending[category].append(item['amount'])
-            
-            category_predictions = {}
-            for category, amounts_list in category_spending.items():
-                if len(amounts_list) >= 3:
-                    category_predictions[category] = {
-                        'predicted': np.mean(amounts_list) * 1.02,
-                        'confidence': min(0.95, 1.0 - (std_spending / mean_spending))
-                    }
+            confidence_95 = 1.96 * std_spending / np.sqrt(amounts.size)
+            
+            # Category-based predictions for categories with at least 3 expenses
+            categories = [t.get('category', 'Other') for t, expense in zip(transactions, is_expense) if expense]
+            category_stats = pd.Series(amounts).groupby(categories, sort=False, dropna=False).agg(['mean', 'count'])
+            category_stats = category_stats[category_stats['count'] >= 3]
+            category_confidence = float(min(0.95, 1.0 - (std_spending / mean_spending)))
+            category_predictions = {
+                category: {
+                    'predicted': float(category_mean * 1.02),
+                    'confidence': category_confidence
+                }
+                for category, category_mean in category_stats['mean'].items()
+            }
             
             return {
                 "prediction_type": "spending_patterns",
@@ -606,9 +704,9 @@ class WatsonService:
                 "statistics": {
                     "mean_monthly_spending": float(mean_spending),
                     "spending_volatility": float(std_spending),
-                    "data_points": len(spending_data)
+                    "data_points": int(amounts.size)
                 },
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _now_iso()
             }
             
         except Exception as e:
@@ -625,25 +723,33 @@ class WatsonService:
             if current_savings <= 0 and monthly_contribution <= 0:
                 return {"error": "Insufficient savings data for prediction"}
             
-            # Calculate future savings for different time periods
-            time_periods = [1, 3, 5, 10, 20]  # years
-            predictions = {}
+            # Calculate future savings for all time periods at once
+            time_periods = np.array([1, 3, 5, 10, 20])  # years
+            months = time_periods * 12
+            monthly_rate = annual_return_rate / 12
+            
+            # Future value formula: FV = PV(1+r)^n + PMT * ((1+r)^n - 1) / r
+            growth = (1 + monthly_rate) ** months
+            future_values = current_savings * growth
+            if monthly_contribution > 0:
+                # The annuity factor ((1+r)^n - 1) / r tends to n as r -> 0
+                future_values = future_values + monthly_contribution * (
+                    (growth - 1) / monthly_rate if monthly_rate else months
+                )
+            total_contributions = monthly_contribution * months
+            interest_earned = future_values - current_savings - total_contributions
             
-            for years in time_periods:
-                months = years * 12
-                monthly_rate = annual_return_rate / 12
-                
-                # Future value formula: FV = PV(1+r)^n + PMT * ((1+r)^n - 1) / r
-                future_value = current_savings * (1 + monthly_rate) ** months
-                if monthly_contribution > 0:
-                    future_value += monthly_contribution * ((1 + monthly_rate) ** months - 1) / monthly_rate
-                
-                predictions[f"{years}_years"] = {
+            predictions = {
+                f"{years}_years": {
                     "future_value": float(future_value),
-                    "total_contributions": float(monthly_contribution * months),
-                    "interest_earned": float(future_value - current_savings - (monthly_contribution * months)),
+                    "total_contributions": float(contributions),
+                    "interest_earned": float(interest),
                     "growth_multiplier": float(future_value / current_savings) if current_savings > 0 else float('inf')
                 }
+                for years, future_value, contributions, interest in zip(
+                    time_periods, future_values, total_contributions, interest_earned
+                )
+            }
             
             return {
                 "prediction_type": "savings_growth",
@@ -652,13 +758,85 @@ class WatsonService:
                 "expected_annual_return": float(annual_return_rate),
                 "predictions": predictions,
                 "recommendations": self._generate_savings_recommendations(current_savings, monthly_contribution),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _now_iso()
             }
             
         except Exception as e:
             logger.error(f"Savings prediction failed: {e}")
             return {"error": f"Savings prediction failed: {str(e)}"}
     
+    async def _predict_savings_growth_batch(self, batch: List[Dict]) -> List[Dict[str, Any]]:
+        """Predict savings growth for several users with one vectorized projection"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        rows = []
+        
+        for i, user_data in enumerate(batch):
+            current_savings = user_data.get('current_savings', 0)
+            monthly_contribution = user_data.get('monthly_contribution', 0)
+            annual_return_rate = user_data.get('expected_return_rate', 0.07)
+            values = (current_savings, monthly_contribution, annual_return_rate)
+            
+            # Anything the vectorized path can't reproduce exactly goes through the scalar path
+            if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                results[i] = await self._predict_savings_growth(user_data)
+            elif current_savings <= 0 and monthly_contribution <= 0:
+                results[i] = {"error": "Insufficient savings data for prediction"}
+            else:
+                rows.append(i)
+        
+        if not rows:
+            return results
+        
+        try:
+            time_periods = [1, 3, 5, 10, 20]  # years
+            months = np.array(time_periods) * 12
+            current = np.array([float(batch[i].get('current_savings', 0)) for i in rows])
+            monthly = np.array([float(batch[i].get('monthly_contribution', 0)) for i in rows])
+            annual = np.array([float(batch[i].get('expected_return_rate', 0.07)) for i in rows])
+            monthly_rate = annual / 12
+            
+            # Future value formula: FV = PV(1+r)^n + PMT * ((1+r)^n - 1) / r, one row per user
+            growth = (1 + monthly_rate[:, None]) ** months[None, :]
+            future_values = current[:, None] * growth
+            # The annuity factor tends to n as r -> 0, so zero-rate rows take n directly
+            annuity = np.divide(
+                growth - 1,
+                monthly_rate[:, None],
+                out=np.broadcast_to(months, growth.shape).astype(np.float64),
+                where=monthly_rate[:, None] != 0
+            )
+            future_values += np.where(monthly[:, None] > 0, monthly[:, None] * annuity, 0.0)
+            total_contributions = monthly[:, None] * months[None, :]
+            interest_earned = future_values - current[:, None] - total_contributions
+            timestamp = _now_iso()
+            
+            for row, i in enumerate(rows):
+                predictions = {}
+                for col, years in enumerate(time_periods):
+                    predictions[f"{years}_years"] = {
+                        "future_value": float(future_values[row, col]),
+                        "total_contributions": float(total_contributions[row, col]),
+                        "interest_earned": float(interest_earned[row, col]),
+                        "growth_multiplier": float(future_values[row, col] / current[row]) if current[row] > 0 else float('inf')
+                    }
+                
+                results[i] = {
+                    "prediction_type": "savings_growth",
+                    "current_savings": float(current[row]),
+                    "monthly_contribution": float(monthly[row]),
+                    "expected_annual_return": float(annual[row]),
+                    "predictions": predictions,
+                    "recommendations": self._generate_savings_recommendations(current[row], monthly[row]),
+                    "timestamp": timestamp
+                }
+            
+        except Exception as e:
+            logger.error(f"Batch savings prediction failed: {e}")
+            for i in rows:
+                results[i] = {"error": f"Savings prediction failed: {str(e)}"}
+        
+        return results
+    
     def _generate_savings_recommendations(self, current_savings: float, monthly_contribution: float) -> List[str]:
         """Generate personalized savings recommendations"""
         recommendations = []
@@ -743,7 +921,7 @@ class WatsonService:
                     "sharpe_ratio": float(weighted_return / volatility) if volatility > 0 else 0,
                     "max_drawdown_estimate": float(volatility * 2)  # Rough estimate
                 },
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _now_iso()
             }
             
         except Exception as e:
@@ -783,18 +961,14 @@ class WatsonService:
         """Generate AI-powered spending insights"""
         try:
             # Analyze spending patterns
-            categories = {}
+            categories = defaultdict(float)
             total_spent = 0
             
             for transaction in transactions:
-                if transaction.get('amount', 0) < 0:  # Expenses
-                    category = transaction.get('category', 'Other')
-                    amount = abs(transaction.get('amount', 0))
-                    
-                    if category not in categories:
-                        categories[category] = 0
-                    categories[category] += amount
-                    total_spent += amount
+                amount = transaction.get('amount', 0)
+                if amount < 0:  # Expenses
+                    categories[transaction.get('category', 'Other')] -= amount
+                    total_spent -= amount
             
             if not categories:
                 return {"error": "No spending data available"}
@@ -969,7 +1143,7 @@ class WatsonService:
                 "intents": response_data["intents"],
                 "entities": response_data["entities"],
                 "context": user_context or {},
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _now_iso(),
                 "fallback": True,
                 "ai_enhanced": True
             }
@@ -980,25 +1154,9 @@ class WatsonService:
     
     async def _analyze_message_intent(self, message: str) -> Dict[str, Any]:
         """Advanced intent analysis using NLP and financial knowledge"""
-        message_lower = message.lower()
-        
-        # Financial categories and their keywords
-        categories = {
-            "savings": ["save", "saving", "savings", "emergency fund", "nest egg"],
-            "investment": ["invest", "investment", "portfolio", "stocks", "bonds", "etf"],
-            "budgeting": ["budget", "budgeting", "spend", "expense", "track"],
-            "debt": ["debt", "credit", "loan", "pay off", "consolidate"],
-            "retirement": ["retirement", "401k", "ira", "pension", "social security"],
-            "taxes": ["tax", "taxes", "deduction", "refund", "filing"],
-            "insurance": ["insurance", "coverage", "policy", "protect"],
-            "real_estate": ["house", "home", "mortgage", "down payment", "real estate"]
-        }
-        
         # Find matching categories
-        matched_categories = []
-        for category, keywords in categories.items():
-            if any(keyword in message_lower for keyword in keywords):
-                matched_categories.append(category)
+        hits = _INTENT_MATCHER.categories(message)
+        matched_categories = [category for category in _INTENT_MATCHER.priority if category in hits]
         
         # Generate contextual response
         response = await self._generate_category_response(matched_categories, message)
@@ -1080,22 +1238,11 @@ class WatsonService:
     
     def _is_financial_question(self, message: str) -> bool:
         """Check if message is a financial question"""
-        financial_keywords = [
-            "money", "finance", "invest", "save", "budget", "debt", "credit",
-            "loan", "retirement", "tax", "insurance", "mortgage", "stock",
-            "bond", "portfolio", "wealth", "income", "expense"
-        ]
-        message_lower = message.lower()
-        return any(keyword in message_lower for keyword in financial_keywords)
+        return "financial" in _QUESTION_MATCHER.categories(message)
     
     def _is_market_question(self, message: str) -> bool:
         """Check if message is about market conditions"""
-        market_keywords = [
-            "market", "stock market", "economy", "recession", "inflation",
-            "interest rate", "fed", "trading", "bull market", "bear market"
-        ]
-        message_lower = message.lower()
-        return any(keyword in message_lower for keyword in market_keywords)
+        return "market" in _QUESTION_MATCHER.categories(message)
     
     async def _get_relevant_market_data(self, message: str) -> Dict[str, Any]:
         """Get relevant market data for market-related questions"""
@@ -3,21 +3,26 @@ Personal Finance Chatbot - FastAPI Backend
 Main application entry point with all routes and middleware
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from contextlib import asynccontextmanager
+import orjson
 import uvicorn
 from typing import List, Optional
 import logging
 
+from app.core.batching import AsyncBatcher
+from app.core.bloom import load_user_bloom
+from app.core.cache import create_redis_client
 from app.core.config import settings
 from app.core.database import engine, Base
 from app.api.v1.api import api_router
-from app.core.security import verify_token
+from app.api.v2.api import api_router as api_v2_router
+from app.core.security import RedisRateLimiter, verify_token
 from app.services.watson_service import WatsonService
 from app.services.financial_service import FinancialService
 
@@ -38,17 +43,41 @@ async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
+    # Existing emails/usernames, so most signups can skip the duplicate lookups
+    app.state.user_bloom = await load_user_bloom()
+    
+    # Shared connection pool, reused by every request
+    app.state.redis = create_redis_client()
+    
+    # Cross-worker rate limiting on the shared Redis pool
+    app.state.rate_limiter = RedisRateLimiter(
+        app.state.redis,
+        max_requests=settings.RATE_LIMIT_PER_MINUTE,
+        window_seconds=60
+    )
+    
     # Initialize services
     app.state.watson_service = WatsonService()
     app.state.financial_service = FinancialService()
     
-    logger.info("Backend services initialized successfully!")
+    # Batch concurrent prediction requests into shared computations
+    app.state.predict_batcher = AsyncBatcher(
+        app.state.watson_service.predict_financial_outcomes_batch,
+        max_batch_size=settings.PREDICT_BATCH_SIZE,
+        max_queue_time=settings.PREDICT_BATCH_WAIT
+    )
+    app.state.predict_batcher.start()
     
-    yield
+    logger.info("Backend services initialized successfully!")
     
-    # Shutdown
-    logger.info("Shutting down Personal Finance Chatbot Backend...")
-    await engine.dispose()
+    try:
+        yield
+    finally:
+        # Shutdown
+        logger.info("Shutting down Personal Finance Chatbot Backend...")
+        await app.state.predict_batcher.stop()
+        await app.state.redis.aclose()
+        await engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
@@ -57,6 +86,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -76,10 +106,10 @@ app.add_middleware(
 )
 
 # Dependency for authentication
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify JWT token and return current user"""
     try:
-        payload = verify_token(credentials.credentials)
+        payload = await verify_token(credentials.credentials, request)
         return payload
     except Exception as e:
         raise HTTPException(
@@ -89,20 +119,23 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
 
 # Health check endpoint
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": "Personal Finance Chatbot Backend",
+    "version": "1.0.0"
+})
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "Personal Finance Chatbot Backend",
-        "version": "1.0.0"
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(api_v2_router, prefix="/api/v2")
 
 # Root endpoint - serve the HTML frontend
 @app.get("/", tags=["Root"])
@@ -110,21 +143,12 @@ async def root():
     """Serve the HTML frontend"""
     return FileResponse("static/index.html")
 
-# Health check endpoint
-@app.get("/health", tags=["Health"])
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "Personal Finance Chatbot Backend",
-        "version": "1.0.0"
-    }
-
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop=settings.EVENT_LOOP
     )
@@ -10,6 +10,8 @@ import sys
 # Add the backend directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
+from app.core.config import settings
+
 if __name__ == "__main__":
     print("🚀 Starting Finance Tracker Application...")
     print("📱 Frontend will be available at: http://localhost:8000")
@@ -22,5 +24,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop=settings.EVENT_LOOP
     )